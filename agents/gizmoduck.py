@@ -121,6 +121,7 @@ def criar_gizmoduck(model=None) -> Agent:
         instructions=instructions,
         tools=[
             tools.get_cripto_dados,
+            tools.get_cripto_dados_lote,
             tools.analisar_seguranca_rede,
             tools.calcular_exposicao_recomendada,
             tools.avaliar_protocolo_defi,
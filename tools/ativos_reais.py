@@ -2,10 +2,197 @@
 Tools para análise de ativos reais e investimentos alternativos
 Imóveis físicos, terrenos, commodities e planejamento patrimonial
 """
-import yfinance as yf
+import math
+from dataclasses import dataclass
 from typing import Optional, List
 
 
+def _centavos(valor: float) -> float:
+    """Arredonda um valor monetário para centavos sem passar por round()"""
+    if valor >= 0:
+        return int(valor * 100.0 + 0.5) / 100.0
+    return int(valor * 100.0 - 0.5) / 100.0
+
+
+def _parcela_price(valor_financiado: float, taxa_mensal: float, n_parcelas: int) -> float:
+    """Parcela fixa pela tabela Price (fator de capitalização calculado uma vez)"""
+    if taxa_mensal > 0:
+        fator = (1 + taxa_mensal) ** n_parcelas
+        return valor_financiado * taxa_mensal * fator / (fator - 1)
+    return valor_financiado / n_parcelas
+
+
+def _valor_futuro_serie(pagamento: float, taxa_mensal: float, n_meses: int) -> float:
+    """Valor futuro de uma série de pagamentos mensais iguais"""
+    if taxa_mensal > 0:
+        return pagamento * (((1 + taxa_mensal) ** n_meses - 1) / taxa_mensal)
+    return pagamento * n_meses
+
+
+@dataclass(frozen=True, slots=True)
+class FinanciamentoInput:
+    """Parâmetros de um financiamento imobiliário, validados uma única vez"""
+    valor_imovel: float
+    entrada_percentual: float = 20
+    taxa_anual: float = 10
+    prazo_anos: int = 30
+    sistema: str = "SAC"
+
+    def __post_init__(self):
+        if self.valor_imovel <= 0:
+            raise ValueError("Valor do imóvel deve ser maior que zero")
+        # 100% de entrada é compra à vista: nada a financiar, parcelas zeradas
+        if not 0 <= self.entrada_percentual <= 100:
+            raise ValueError("Entrada deve estar entre 0% e 100% do valor do imóvel")
+        if self.taxa_anual < 0:
+            raise ValueError("Taxa de juros não pode ser negativa")
+        if self.prazo_anos <= 0:
+            raise ValueError("Prazo deve ser maior que zero")
+        object.__setattr__(self, "sistema", self.sistema.upper())
+
+
+@dataclass(slots=True)
+class ResultadoImovelAluguel:
+    """Resultado da análise de um imóvel para aluguel"""
+    valor_imovel: float
+    aluguel_mensal: float
+    meses_ocupados: int
+    receita_bruta_anual: float
+    receita_liquida_anual: float
+    condominio_anual: float
+    iptu_anual: float
+    manutencao_anual: float
+    despesas_totais: float
+    resultado_liquido: float
+    yield_bruto: float
+    yield_liquido: float
+    analise: str
+
+    def to_dict(self) -> dict:
+        return {
+            "valor_imovel": self.valor_imovel,
+            "aluguel_mensal": self.aluguel_mensal,
+            "receita": {
+                "bruta_anual": self.receita_bruta_anual,
+                "liquida_anual": _centavos(self.receita_liquida_anual),
+                "meses_ocupados": self.meses_ocupados
+            },
+            "despesas": {
+                "condominio_anual_vacancia": self.condominio_anual,
+                "iptu_anual": self.iptu_anual,
+                "manutencao_anual": _centavos(self.manutencao_anual),
+                "total_anual": _centavos(self.despesas_totais)
+            },
+            "resultado_liquido_anual": _centavos(self.resultado_liquido),
+            "resultado_liquido_mensal": _centavos(self.resultado_liquido / 12),
+            "indicadores": {
+                "yield_bruto": f"{self.yield_bruto:.2f}%",
+                "yield_liquido": f"{self.yield_liquido:.2f}%",
+                "cap_rate": f"{self.yield_liquido:.2f}%"  # Cap Rate = NOI / Valor do imóvel
+            },
+            "analise": self.analise
+        }
+
+
+@dataclass(slots=True)
+class ResultadoCompraVsAluguel:
+    """Resultado do comparativo comprar vs. alugar"""
+    valor_imovel: float
+    entrada: float
+    valor_financiado: float
+    parcela: float
+    total_pago: float
+    juros_totais: float
+    valor_futuro_imovel: float
+    aluguel_mensal: float
+    custo_aluguel_total: float
+    entrada_investida: float
+    diferenca_investida: float
+    patrimonio_aluguel: float
+    prazo_anos: int
+    taxa_financiamento_anual: float
+    valorizacao_anual: float
+    rendimento_alternativo: float
+
+    def to_dict(self) -> dict:
+        return {
+            "cenario_compra": {
+                "valor_imovel": self.valor_imovel,
+                "entrada": self.entrada,
+                "valor_financiado": self.valor_financiado,
+                "parcela_mensal": _centavos(self.parcela),
+                "total_pago": _centavos(self.total_pago),
+                "juros_pagos": _centavos(self.juros_totais),
+                "valor_imovel_futuro": _centavos(self.valor_futuro_imovel),
+                "patrimonio_final": _centavos(self.valor_futuro_imovel)
+            },
+            "cenario_aluguel": {
+                "aluguel_mensal": self.aluguel_mensal,
+                "gasto_aluguel_total": _centavos(self.custo_aluguel_total),
+                "entrada_investida_futuro": _centavos(self.entrada_investida),
+                "diferenca_investida_futuro": _centavos(self.diferenca_investida),
+                "patrimonio_final": _centavos(self.patrimonio_aluguel)
+            },
+            "comparativo": {
+                "diferenca_patrimonio": _centavos(self.valor_futuro_imovel - self.patrimonio_aluguel),
+                "melhor_opcao": "Comprar" if self.valor_futuro_imovel > self.patrimonio_aluguel else "Alugar",
+                "prazo_anos": self.prazo_anos
+            },
+            "premissas": {
+                "taxa_financiamento": f"{self.taxa_financiamento_anual}% a.a.",
+                "valorizacao_imovel": f"{self.valorizacao_anual}% a.a.",
+                "rendimento_investimentos": f"{self.rendimento_alternativo}% a.a."
+            },
+            "aviso": "Análise simplificada. Considere custos de transação, ITBI, escritura, manutenção, etc."
+        }
+
+
+@dataclass(slots=True)
+class ResultadoFinanciamento:
+    """Resultado de uma simulação de financiamento (SAC ou PRICE)"""
+    sistema: str
+    valor_imovel: float
+    entrada: float
+    valor_financiado: float
+    taxa_anual: float
+    prazo_anos: int
+    n_parcelas: int
+    primeira_parcela: float
+    ultima_parcela: float
+    amortizacao: float
+    total_juros: float
+    total_pago: float
+
+    def to_dict(self) -> dict:
+        if self.sistema == "SAC":
+            return {
+                "sistema": "SAC (Amortização Constante)",
+                "valor_imovel": self.valor_imovel,
+                "entrada": self.entrada,
+                "valor_financiado": self.valor_financiado,
+                "taxa_anual": f"{self.taxa_anual}%",
+                "prazo": f"{self.prazo_anos} anos ({self.n_parcelas} parcelas)",
+                "primeira_parcela": _centavos(self.primeira_parcela),
+                "ultima_parcela": _centavos(self.ultima_parcela),
+                "amortizacao_mensal": _centavos(self.amortizacao),
+                "total_juros": _centavos(self.total_juros),
+                "total_pago": _centavos(self.total_pago),
+                "caracteristica": "Parcelas decrescentes - começa mais alto e vai diminuindo"
+            }
+        return {
+            "sistema": "PRICE (Parcelas Fixas)",
+            "valor_imovel": self.valor_imovel,
+            "entrada": self.entrada,
+            "valor_financiado": self.valor_financiado,
+            "taxa_anual": f"{self.taxa_anual}%",
+            "prazo": f"{self.prazo_anos} anos ({self.n_parcelas} parcelas)",
+            "parcela_fixa": _centavos(self.primeira_parcela),
+            "total_juros": _centavos(self.total_juros),
+            "total_pago": _centavos(self.total_pago),
+            "caracteristica": "Parcelas fixas durante todo o financiamento"
+        }
+
+
 class AtivosReaisTools:
     """Ferramentas para análise de ativos reais e alternativos"""
 
@@ -32,6 +219,19 @@ class AtivosReaisTools:
         Returns:
             Análise completa de rentabilidade
         """
+        return self._calcular_imovel_aluguel(
+            valor_imovel, aluguel_mensal, condominio, iptu_anual, vacancia_meses, manutencao_anual_percentual
+        ).to_dict()
+
+    def _calcular_imovel_aluguel(
+        self,
+        valor_imovel: float,
+        aluguel_mensal: float,
+        condominio: float,
+        iptu_anual: float,
+        vacancia_meses: int,
+        manutencao_anual_percentual: float
+    ) -> ResultadoImovelAluguel:
         # Receitas
         meses_ocupados = 12 - vacancia_meses
         receita_bruta_anual = aluguel_mensal * 12
@@ -48,31 +248,22 @@ class AtivosReaisTools:
         # Yields
         yield_bruto = (receita_bruta_anual / valor_imovel) * 100
         yield_liquido = (resultado_liquido / valor_imovel) * 100
-        cap_rate = yield_liquido  # Cap Rate = NOI / Valor do imóvel
 
-        return {
-            "valor_imovel": valor_imovel,
-            "aluguel_mensal": aluguel_mensal,
-            "receita": {
-                "bruta_anual": receita_bruta_anual,
-                "liquida_anual": round(receita_liquida_anual, 2),
-                "meses_ocupados": meses_ocupados
-            },
-            "despesas": {
-                "condominio_anual_vacancia": condominio_anual,
-                "iptu_anual": iptu_anual,
-                "manutencao_anual": round(manutencao_anual, 2),
-                "total_anual": round(despesas_totais, 2)
-            },
-            "resultado_liquido_anual": round(resultado_liquido, 2),
-            "resultado_liquido_mensal": round(resultado_liquido / 12, 2),
-            "indicadores": {
-                "yield_bruto": f"{yield_bruto:.2f}%",
-                "yield_liquido": f"{yield_liquido:.2f}%",
-                "cap_rate": f"{cap_rate:.2f}%"
-            },
-            "analise": self._classificar_yield(yield_liquido)
-        }
+        return ResultadoImovelAluguel(
+            valor_imovel=valor_imovel,
+            aluguel_mensal=aluguel_mensal,
+            meses_ocupados=meses_ocupados,
+            receita_bruta_anual=receita_bruta_anual,
+            receita_liquida_anual=receita_liquida_anual,
+            condominio_anual=condominio_anual,
+            iptu_anual=iptu_anual,
+            manutencao_anual=manutencao_anual,
+            despesas_totais=despesas_totais,
+            resultado_liquido=resultado_liquido,
+            yield_bruto=yield_bruto,
+            yield_liquido=yield_liquido,
+            analise=self._classificar_yield(yield_liquido)
+        )
 
     def _classificar_yield(self, yield_liquido: float) -> str:
         if yield_liquido >= 8:
@@ -109,72 +300,88 @@ class AtivosReaisTools:
         Returns:
             Comparativo detalhado
         """
+        try:
+            parametros = FinanciamentoInput(
+                valor_imovel, entrada_percentual, taxa_financiamento_anual, prazo_anos, "PRICE"
+            )
+        except ValueError as e:
+            return {"erro": str(e)}
+
+        return self._calcular_compra_vs_aluguel(
+            parametros, aluguel_atual, valorizacao_anual, rendimento_alternativo
+        ).to_dict()
+
+    def _calcular_compra_vs_aluguel(
+        self,
+        parametros: FinanciamentoInput,
+        aluguel_atual: float,
+        valorizacao_anual: float,
+        rendimento_alternativo: float
+    ) -> ResultadoCompraVsAluguel:
+        valor_imovel = parametros.valor_imovel
+        taxa_financiamento_anual = parametros.taxa_anual
+        prazo_anos = parametros.prazo_anos
+
         # Cálculos de compra
-        entrada = valor_imovel * (entrada_percentual / 100)
+        entrada = valor_imovel * (parametros.entrada_percentual / 100)
         valor_financiado = valor_imovel - entrada
         taxa_mensal = (taxa_financiamento_anual / 100) / 12
         n_parcelas = prazo_anos * 12
 
+        # Fatores de capitalização compartilhados pelos cenários.
+        # Como n_parcelas = 12 * prazo_anos, (1 + taxa_rend_mensal)**n_parcelas
+        # é o próprio fator anual do rendimento alternativo.
+        fator_valorizacao = (1 + valorizacao_anual/100) ** prazo_anos
+        fator_rendimento = (1 + rendimento_alternativo/100) ** prazo_anos
+
         # Parcela (Price)
-        if taxa_mensal > 0:
-            parcela = valor_financiado * (taxa_mensal * (1 + taxa_mensal)**n_parcelas) / ((1 + taxa_mensal)**n_parcelas - 1)
-        else:
-            parcela = valor_financiado / n_parcelas
+        parcela = _parcela_price(valor_financiado, taxa_mensal, n_parcelas)
 
         total_pago = entrada + (parcela * n_parcelas)
         juros_totais = total_pago - valor_imovel
 
         # Valor futuro do imóvel
-        valor_futuro_imovel = valor_imovel * ((1 + valorizacao_anual/100) ** prazo_anos)
+        valor_futuro_imovel = valor_imovel * fator_valorizacao
 
         # Cenário aluguel + investimento
         custo_aluguel_total = aluguel_atual * 12 * prazo_anos  # Simplificado, sem reajuste
 
         # Se investisse a entrada
-        entrada_investida = entrada * ((1 + rendimento_alternativo/100) ** prazo_anos)
+        entrada_investida = entrada * fator_rendimento
 
         # Diferença mensal (parcela - aluguel) investida
         diferenca_mensal = parcela - aluguel_atual
         if diferenca_mensal > 0:
             # Taxa mensal de rendimento
-            taxa_rend_mensal = (1 + rendimento_alternativo/100) ** (1/12) - 1
+            taxa_rend_mensal = math.expm1(math.log1p(rendimento_alternativo/100) / 12)
             # Valor futuro das diferenças investidas
-            diferenca_investida = diferenca_mensal * (((1 + taxa_rend_mensal)**n_parcelas - 1) / taxa_rend_mensal)
+            if taxa_rend_mensal != 0:
+                diferenca_investida = diferenca_mensal * ((fator_rendimento - 1) / taxa_rend_mensal)
+            else:
+                diferenca_investida = diferenca_mensal * n_parcelas
         else:
             diferenca_investida = 0
 
         patrimonio_aluguel = entrada_investida + diferenca_investida
 
-        return {
-            "cenario_compra": {
-                "valor_imovel": valor_imovel,
-                "entrada": entrada,
-                "valor_financiado": valor_financiado,
-                "parcela_mensal": round(parcela, 2),
-                "total_pago": round(total_pago, 2),
-                "juros_pagos": round(juros_totais, 2),
-                "valor_imovel_futuro": round(valor_futuro_imovel, 2),
-                "patrimonio_final": round(valor_futuro_imovel, 2)
-            },
-            "cenario_aluguel": {
-                "aluguel_mensal": aluguel_atual,
-                "gasto_aluguel_total": round(custo_aluguel_total, 2),
-                "entrada_investida_futuro": round(entrada_investida, 2),
-                "diferenca_investida_futuro": round(diferenca_investida, 2),
-                "patrimonio_final": round(patrimonio_aluguel, 2)
-            },
-            "comparativo": {
-                "diferenca_patrimonio": round(valor_futuro_imovel - patrimonio_aluguel, 2),
-                "melhor_opcao": "Comprar" if valor_futuro_imovel > patrimonio_aluguel else "Alugar",
-                "prazo_anos": prazo_anos
-            },
-            "premissas": {
-                "taxa_financiamento": f"{taxa_financiamento_anual}% a.a.",
-                "valorizacao_imovel": f"{valorizacao_anual}% a.a.",
-                "rendimento_investimentos": f"{rendimento_alternativo}% a.a."
-            },
-            "aviso": "Análise simplificada. Considere custos de transação, ITBI, escritura, manutenção, etc."
-        }
+        return ResultadoCompraVsAluguel(
+            valor_imovel=valor_imovel,
+            entrada=entrada,
+            valor_financiado=valor_financiado,
+            parcela=parcela,
+            total_pago=total_pago,
+            juros_totais=juros_totais,
+            valor_futuro_imovel=valor_futuro_imovel,
+            aluguel_mensal=aluguel_atual,
+            custo_aluguel_total=custo_aluguel_total,
+            entrada_investida=entrada_investida,
+            diferenca_investida=diferenca_investida,
+            patrimonio_aluguel=patrimonio_aluguel,
+            prazo_anos=prazo_anos,
+            taxa_financiamento_anual=taxa_financiamento_anual,
+            valorizacao_anual=valorizacao_anual,
+            rendimento_alternativo=rendimento_alternativo
+        )
 
     def simular_financiamento(
         self,
@@ -197,12 +404,36 @@ class AtivosReaisTools:
         Returns:
             Simulação do financiamento
         """
-        entrada = valor_imovel * (entrada_percentual / 100)
+        try:
+            parametros = FinanciamentoInput(valor_imovel, entrada_percentual, taxa_anual, prazo_anos, sistema)
+        except ValueError as e:
+            return {"erro": str(e)}
+
+        return self.simular_financiamento_parametros(parametros).to_dict()
+
+    def simular_financiamento_parametros(self, parametros: FinanciamentoInput) -> ResultadoFinanciamento:
+        """
+        Simula um financiamento a partir de parâmetros já validados.
+
+        Permite reutilizar o mesmo FinanciamentoInput em análises de
+        sensibilidade sem repetir a validação a cada chamada.
+
+        Args:
+            parametros: Parâmetros do financiamento
+
+        Returns:
+            Simulação do financiamento (use to_dict() para serializar)
+        """
+        valor_imovel = parametros.valor_imovel
+        taxa_anual = parametros.taxa_anual
+        prazo_anos = parametros.prazo_anos
+
+        entrada = valor_imovel * (parametros.entrada_percentual / 100)
         valor_financiado = valor_imovel - entrada
         taxa_mensal = (taxa_anual / 100) / 12
         n_parcelas = prazo_anos * 12
 
-        if sistema.upper() == "SAC":
+        if parametros.sistema == "SAC":
             # SAC: Amortização constante
             amortizacao = valor_financiado / n_parcelas
             primeira_parcela = amortizacao + (valor_financiado * taxa_mensal)
@@ -211,43 +442,29 @@ class AtivosReaisTools:
             # Total pago (soma de PA)
             total_juros = (primeira_parcela - amortizacao + ultima_parcela - amortizacao) * n_parcelas / 2
             total_pago = valor_financiado + total_juros
-
-            return {
-                "sistema": "SAC (Amortização Constante)",
-                "valor_imovel": valor_imovel,
-                "entrada": entrada,
-                "valor_financiado": valor_financiado,
-                "taxa_anual": f"{taxa_anual}%",
-                "prazo": f"{prazo_anos} anos ({n_parcelas} parcelas)",
-                "primeira_parcela": round(primeira_parcela, 2),
-                "ultima_parcela": round(ultima_parcela, 2),
-                "amortizacao_mensal": round(amortizacao, 2),
-                "total_juros": round(total_juros, 2),
-                "total_pago": round(total_pago, 2),
-                "caracteristica": "Parcelas decrescentes - começa mais alto e vai diminuindo"
-            }
         else:
             # PRICE: Parcelas fixas
-            if taxa_mensal > 0:
-                parcela = valor_financiado * (taxa_mensal * (1 + taxa_mensal)**n_parcelas) / ((1 + taxa_mensal)**n_parcelas - 1)
-            else:
-                parcela = valor_financiado / n_parcelas
+            parcela = _parcela_price(valor_financiado, taxa_mensal, n_parcelas)
 
+            amortizacao = 0.0
+            primeira_parcela = ultima_parcela = parcela
             total_pago = parcela * n_parcelas
             total_juros = total_pago - valor_financiado
 
-            return {
-                "sistema": "PRICE (Parcelas Fixas)",
-                "valor_imovel": valor_imovel,
-                "entrada": entrada,
-                "valor_financiado": valor_financiado,
-                "taxa_anual": f"{taxa_anual}%",
-                "prazo": f"{prazo_anos} anos ({n_parcelas} parcelas)",
-                "parcela_fixa": round(parcela, 2),
-                "total_juros": round(total_juros, 2),
-                "total_pago": round(total_pago, 2),
-                "caracteristica": "Parcelas fixas durante todo o financiamento"
-            }
+        return ResultadoFinanciamento(
+            sistema=parametros.sistema,
+            valor_imovel=valor_imovel,
+            entrada=entrada,
+            valor_financiado=valor_financiado,
+            taxa_anual=taxa_anual,
+            prazo_anos=prazo_anos,
+            n_parcelas=n_parcelas,
+            primeira_parcela=primeira_parcela,
+            ultima_parcela=ultima_parcela,
+            amortizacao=amortizacao,
+            total_juros=total_juros,
+            total_pago=total_pago
+        )
 
     def comparar_fii_vs_imovel_fisico(
         self,
@@ -274,8 +491,8 @@ class AtivosReaisTools:
         comparativo = {
             "valor_investimento": valor_investimento,
             "fii": {
-                "renda_anual_estimada": round(renda_fii_anual, 2),
-                "renda_mensal_estimada": round(renda_fii_anual / 12, 2),
+                "renda_anual_estimada": _centavos(renda_fii_anual),
+                "renda_mensal_estimada": _centavos(renda_fii_anual / 12),
                 "yield": f"{yield_fii}%",
                 "vantagens": [
                     "Alta liquidez - vende em segundos na bolsa",
@@ -293,8 +510,8 @@ class AtivosReaisTools:
                 ]
             },
             "imovel_fisico": {
-                "renda_anual_estimada": round(renda_imovel_anual, 2),
-                "renda_mensal_estimada": round(renda_imovel_anual / 12, 2),
+                "renda_anual_estimada": _centavos(renda_imovel_anual),
+                "renda_mensal_estimada": _centavos(renda_imovel_anual / 12),
                 "yield": f"{yield_imovel}%",
                 "vantagens": [
                     "Ativo tangível - 'tijolo' real",
@@ -313,7 +530,7 @@ class AtivosReaisTools:
                     "Risco de inadimplência"
                 ]
             },
-            "diferenca_renda_anual": round(renda_fii_anual - renda_imovel_anual, 2),
+            "diferenca_renda_anual": _centavos(renda_fii_anual - renda_imovel_anual),
             "recomendacao": self._recomendar_fii_ou_imovel(valor_investimento, liquidez_importante, yield_fii, yield_imovel)
         }
 
@@ -360,22 +577,22 @@ class AtivosReaisTools:
             "terreno": {
                 "valor_atual": valor_terreno,
                 "area_m2": area_m2,
-                "preco_m2": round(preco_m2, 2)
+                "preco_m2": _centavos(preco_m2)
             },
             "projecao": {
                 "horizonte_anos": anos_horizonte,
                 "valorizacao_anual": f"{valorizacao_anual_esperada}%",
-                "valor_futuro": round(valor_futuro, 2),
-                "valorizacao_total": round(valorizacao_total, 2),
-                "preco_m2_futuro": round(valor_futuro / area_m2, 2)
+                "valor_futuro": _centavos(valor_futuro),
+                "valorizacao_total": _centavos(valorizacao_total),
+                "preco_m2_futuro": _centavos(valor_futuro / area_m2)
             },
             "custos": {
                 "iptu_anual": iptu_anual,
                 "iptu_total_periodo": custo_iptu_total
             },
             "resultado": {
-                "lucro_bruto": round(valorizacao_total, 2),
-                "lucro_liquido": round(lucro_liquido, 2),
+                "lucro_bruto": _centavos(valorizacao_total),
+                "lucro_liquido": _centavos(lucro_liquido),
                 "rentabilidade_total": f"{((valor_futuro/valor_terreno) - 1) * 100:.1f}%"
             },
             "consideracoes": [
@@ -395,6 +612,8 @@ class AtivosReaisTools:
             Cotação e informações sobre ouro
         """
         try:
+            import yfinance as yf  # lazy: dependência pesada, usada só aqui
+
             # Ouro em dólares
             ouro_usd = yf.Ticker("GC=F")
             info_usd = ouro_usd.info
@@ -414,10 +633,10 @@ class AtivosReaisTools:
 
             return {
                 "ativo": "Ouro (Gold Futures)",
-                "preco_onca_usd": round(preco_usd, 2),
-                "preco_onca_brl": round(preco_brl, 2),
-                "preco_grama_brl": round(preco_brl / 31.1035, 2),  # 1 onça = 31.1035 gramas
-                "cotacao_dolar": round(dolar, 2),
+                "preco_onca_usd": _centavos(preco_usd),
+                "preco_onca_brl": _centavos(preco_brl),
+                "preco_grama_brl": _centavos(preco_brl / 31.1035),  # 1 onça = 31.1035 gramas
+                "cotacao_dolar": _centavos(dolar),
                 "variacao_12_meses": f"{variacao_ano:.1f}%",
                 "caracteristicas": {
                     "reserva_valor": "Proteção contra inflação e crises",
@@ -530,10 +749,7 @@ class AtivosReaisTools:
 
         # Valor futuro dos aportes (série de pagamentos)
         n_meses = anos * 12
-        if taxa_mensal > 0:
-            vf_aportes = aporte_mensal * (((1 + taxa_mensal)**n_meses - 1) / taxa_mensal)
-        else:
-            vf_aportes = aporte_mensal * n_meses
+        vf_aportes = _valor_futuro_serie(aporte_mensal, taxa_mensal, n_meses)
 
         patrimonio_futuro_nominal = vf_patrimonio + vf_aportes
         total_aportado = patrimonio_atual + (aporte_mensal * n_meses)
@@ -556,15 +772,15 @@ class AtivosReaisTools:
                 "rendimento_real": f"{rendimento_real:.1f}% a.a."
             },
             "projecao": {
-                "total_aportado": round(total_aportado, 2),
-                "patrimonio_futuro_nominal": round(patrimonio_futuro_nominal, 2),
-                "patrimonio_futuro_real": round(patrimonio_futuro_real, 2),
-                "ganho_total": round(patrimonio_futuro_nominal - total_aportado, 2)
+                "total_aportado": _centavos(total_aportado),
+                "patrimonio_futuro_nominal": _centavos(patrimonio_futuro_nominal),
+                "patrimonio_futuro_real": _centavos(patrimonio_futuro_real),
+                "ganho_total": _centavos(patrimonio_futuro_nominal - total_aportado)
             },
             "renda_passiva": {
                 "regra_4_porcento": "Retirar 4% ao ano preserva o patrimônio",
-                "renda_mensal_estimada": round(renda_passiva_mensal, 2),
-                "renda_anual_estimada": round(renda_passiva_mensal * 12, 2)
+                "renda_mensal_estimada": _centavos(renda_passiva_mensal),
+                "renda_anual_estimada": _centavos(renda_passiva_mensal * 12)
             },
             "legado": {
                 "mensagem": f"Em {anos} anos, você pode deixar R$ {patrimonio_futuro_nominal:,.0f} para as próximas gerações",
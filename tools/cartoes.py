@@ -7,6 +7,7 @@ import os
 import io
 import csv
 import re
+import sys
 import base64
 from typing import List, Dict, Optional, TypedDict
 from datetime import datetime, timedelta
@@ -18,7 +19,10 @@ class Transacao(TypedDict, total=False):
     data: str
 
 
-from collections import defaultdict
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,6 +34,18 @@ try:
 except ImportError:
     PANDAS_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 try:
     from googleapiclient.discovery import build
     from google.oauth2.credentials import Credentials
@@ -40,6 +56,30 @@ try:
 except ImportError:
     GOOGLE_APIS_AVAILABLE = False
 
+# Palavras que indicam cobrança de serviço financeiro (juros, taxas, encargos)
+_TAXA_RE = re.compile("juros|multa|encargo|iof|tarifa")
+# Dígitos removidos das descrições para agrupar cobranças recorrentes
+_DIGITOS_RE = re.compile(r'\d+')
+
+# A partir deste tamanho de extrato compensa agregar com pandas
+_MIN_TRANSACOES_PANDAS = 200
+# Transações detalhadas na análise do extrato (limitar para não sobrecarregar)
+_MAX_CLASSIFICADAS_DETALHADAS = 20
+# Recorrências suspeitas listadas na detecção de assinaturas
+_MAX_RECORRENCIAS = 10
+
+# Chamadas por requisição em lote ao Gmail (a API aceita até 100; 50 evita limite de taxa)
+_GMAIL_LOTE = 50
+# IDs por chamada de users.messages.batchModify (limite da API)
+_GMAIL_MODIFICAR_LOTE = 1000
+# Só o que é lido das mensagens: cabeçalhos e nome/id dos anexos
+_GMAIL_CAMPOS_MENSAGEM = "payload(headers,parts(filename,body/attachmentId))"
+# Até este tamanho o upload ao Drive é simples (multipart), sem sessão resumível
+_DRIVE_UPLOAD_SIMPLES_MAX = 5 * 1024 * 1024
+
+# Clientes das APIs do Google já construídos: (api, versão, conta) -> serviço
+_SERVICOS_GOOGLE = {}
+
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',
     'https://www.googleapis.com/auth/gmail.modify',
@@ -50,11 +90,47 @@ SCOPES = [
 ]
 
 
+def _normalizar(descricao: str) -> str:
+    """
+    Normaliza uma descrição para busca de palavras-chave.
+
+    Usa str.lower(), que já tem caminho rápido para texto ASCII e trata
+    acentos corretamente; é chamada uma única vez por transação. O resultado
+    é internado, então descrições repetidas compartilham o mesmo objeto e as
+    chaves dos dicionários de agrupamento são comparadas por identidade.
+    """
+    return sys.intern(descricao.lower())
+
+
+def _parcela_price(valor_total: float, num_parcelas: int, taxa: float) -> float:
+    """Parcela fixa pela tabela Price (taxa mensal em decimal, maior que zero)"""
+    fator = (1 + taxa) ** num_parcelas
+    return valor_total * (taxa * fator) / (fator - 1)
+
+
+@dataclass
+class _Varredura:
+    """Estruturas acumuladas em uma única passada sobre as transações de um extrato"""
+    descricoes: List[Optional[str]] = field(default_factory=list)
+    descricoes_lower: List[str] = field(default_factory=list)
+    valores: List[float] = field(default_factory=list)
+    # Mesmos valores em um array contíguo float64 (None sem numpy)
+    valores_array: Optional["np.ndarray"] = None
+    # Soma dos valores, calculada uma vez para o resumo e para a média das anomalias
+    total: float = 0.0
+    # Só as primeiras _MAX_CLASSIFICADAS_DETALHADAS; o resto entra apenas nos totais
+    classificadas: List[dict] = field(default_factory=list)
+    gastos_categoria: Counter = field(default_factory=Counter)
+    assinaturas_encontradas: List[dict] = field(default_factory=list)
+    # descrição simplificada -> [ocorrências, primeiro valor, todos iguais?, até 5 valores]
+    possiveis_recorrentes: Dict[str, list] = field(default_factory=dict)
+
+
 class CartoesTools:
     """Ferramentas para análise de extratos de cartões de crédito"""
 
     # Categorias e palavras-chave para classificação automática
-    CATEGORIAS = {
+    CATEGORIAS = MappingProxyType({
         "alimentacao": {
             "keywords": ["ifood", "uber eats", "rappi", "zé delivery", "restaurante", "lanchonete",
                         "padaria", "supermercado", "mercado", "hortifruti", "açougue", "pão de açucar",
@@ -108,10 +184,10 @@ class CartoesTools:
                         "protecao", "saque", "transferencia"],
             "emoji": "🏦"
         }
-    }
+    })
 
     # Assinaturas conhecidas com valores típicos
-    ASSINATURAS_CONHECIDAS = {
+    ASSINATURAS_CONHECIDAS = MappingProxyType({
         "netflix": {"nome": "Netflix", "valor_tipico": (22.90, 55.90)},
         "spotify": {"nome": "Spotify", "valor_tipico": (21.90, 34.90)},
         "amazon prime": {"nome": "Amazon Prime", "valor_tipico": (14.90, 19.90)},
@@ -122,7 +198,33 @@ class CartoesTools:
         "google one": {"nome": "Google One", "valor_tipico": (6.99, 34.99)},
         "gympass": {"nome": "Gympass", "valor_tipico": (49.90, 249.90)},
         "smart fit": {"nome": "Smart Fit", "valor_tipico": (99.90, 149.90)},
-    }
+    })
+
+    # Estabelecimentos mais frequentes nos extratos, em ordem de ocorrência.
+    # Usado só para desempatar, na lista plana, palavras de mesmo tamanho da
+    # mesma categoria; a ordem exibida em CATEGORIAS não muda.
+    _FREQ_ORDER = {k: i for i, k in enumerate([
+        "ifood", "uber", "99", "mercado", "supermercado", "posto", "netflix", "spotify",
+        "amazon", "mercado livre", "farmacia", "drogasil", "padaria", "iof", "juros",
+        "shopee", "magalu", "apple", "google", "smart fit", "vivo", "claro", "enel",
+    ])}
+
+    # Estruturas derivadas, montadas uma vez por _preparar_indices()
+    # Autômato Aho-Corasick com todas as palavras-chave (None sem pyahocorasick)
+    _AC_AUTOMATON = None
+    # Função gerada com um teste "in" por palavra-chave (sem pyahocorasick)
+    _CLASSIFICAR_GERADO = None
+    # Pares (palavra-chave, (prioridade, categoria, emoji)), da mais longa para a mais curta
+    _KEYWORDS_PLANAS = None
+    # Regex única com as chaves de ASSINATURAS_CONHECIDAS, na ordem de declaração
+    _ASSINATURAS_RE = None
+    _ASSINATURAS_CHAVES = None
+    # Mesmas chaves em um autômato Aho-Corasick (None sem pyahocorasick)
+    _ASSINATURAS_AUTOMATON = None
+    # Nomes das categorias por id ("outros" é o último)
+    _NOMES_CATEGORIAS = None
+    # Rótulo exibido no resumo ("emoji Nome") por categoria
+    _ROTULOS_CATEGORIAS = None
 
     def __init__(self):
         self.transacoes = []
@@ -130,6 +232,7 @@ class CartoesTools:
         self._gmail_service = None
         self._drive_service = None
         self._sheets_service = None
+        self._abas_planilha = {}  # planilha -> {título da aba: sheetId} já conhecidos
         self._credentials = None
 
     def classificar_transacao(self, descricao: str, valor: float) -> dict:
@@ -143,18 +246,24 @@ class CartoesTools:
         Returns:
             Dicionário com classificação
         """
-        descricao_lower = descricao.lower()
+        return self._classificar(descricao, _normalizar(descricao), valor)
 
-        for categoria, info in self.CATEGORIAS.items():
-            for keyword in info["keywords"]:
-                if keyword in descricao_lower:
-                    return {
-                        "descricao": descricao,
-                        "valor": valor,
-                        "categoria": categoria,
-                        "emoji": info["emoji"],
-                        "confianca": "alta"
-                    }
+    def _classificar(self, descricao: str, descricao_lower: str, valor: float) -> dict:
+        """Classifica uma transação cuja descrição já foi normalizada"""
+        return self._montar_classificacao(descricao, valor, self._buscar_categoria(descricao_lower))
+
+    @staticmethod
+    def _montar_classificacao(descricao: str, valor: float, encontrada: Optional[tuple]) -> dict:
+        """Monta o dicionário de classificação a partir do resultado de _buscar_categoria"""
+        if encontrada:
+            _, categoria, emoji = encontrada
+            return {
+                "descricao": descricao,
+                "valor": valor,
+                "categoria": categoria,
+                "emoji": emoji,
+                "confianca": "alta"
+            }
 
         # Se não encontrou, tenta classificação genérica
         return {
@@ -165,6 +274,243 @@ class CartoesTools:
             "confianca": "baixa"
         }
 
+    def __init_subclass__(cls, **kwargs):
+        """Subclasses podem redefinir CATEGORIAS; os índices são refeitos para elas"""
+        super().__init_subclass__(**kwargs)
+        cls._preparar_indices()
+
+    @classmethod
+    def _preparar_indices(cls):
+        """
+        Deriva de CATEGORIAS e ASSINATURAS_CONHECIDAS todas as estruturas de
+        busca. Roda uma vez, na importação do módulo (e na criação de
+        subclasses); os métodos de classificação só leem o resultado.
+        """
+        # Palavra-chave -> (prioridade, categoria, emoji), base da lista plana
+        indice = {}
+        for prioridade, (categoria, info) in enumerate(cls.CATEGORIAS.items()):
+            for keyword in info["keywords"]:
+                indice.setdefault(keyword, (prioridade, categoria, info["emoji"]))  # mantém a categoria declarada primeiro
+
+        # Lista plana da palavra-chave mais longa (mais específica) para a mais
+        # curta; empates seguem a ordem de CATEGORIAS
+        sem_rank = len(cls._FREQ_ORDER)
+        cls._KEYWORDS_PLANAS = tuple(sorted(
+            indice.items(),
+            key=lambda item: (-len(item[0]), item[1][0], cls._FREQ_ORDER.get(item[0], sem_rank))
+        ))
+        cls._CLASSIFICAR_GERADO = cls._gerar_classificador(cls._KEYWORDS_PLANAS)
+        cls._NOMES_CATEGORIAS = (*cls.CATEGORIAS, "outros")
+        cls._ROTULOS_CATEGORIAS = MappingProxyType({
+            **{cat: f"{info['emoji']} {cat.replace('_', ' ').title()}" for cat, info in cls.CATEGORIAS.items()},
+            "outros": "❓ Outros",
+        })
+
+        cls._AC_AUTOMATON = None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for ordem, (keyword, valor) in enumerate(cls._KEYWORDS_PLANAS):
+                automaton.add_word(keyword, (ordem, valor))
+            automaton.make_automaton()
+            cls._AC_AUTOMATON = automaton
+
+        cls._ASSINATURAS_CHAVES = tuple(cls.ASSINATURAS_CONHECIDAS)
+        cls._ASSINATURAS_RE = re.compile("|".join(re.escape(k) for k in cls._ASSINATURAS_CHAVES))
+        cls._ASSINATURAS_AUTOMATON = None
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for prioridade, chave in enumerate(cls._ASSINATURAS_CHAVES):
+                automaton.add_word(chave, (prioridade, chave))
+            automaton.make_automaton()
+            cls._ASSINATURAS_AUTOMATON = automaton
+
+    @classmethod
+    def _gerar_classificador(cls, keywords_planas: tuple):
+        """
+        Gera uma função em linha reta com um "if palavra in d: return ..." por
+        palavra-chave, na ordem da lista plana (mais longa primeiro). Sem laços
+        nem acessos a dict, o interpretador só compara constantes; as palavras
+        entram via repr(), então aspas ou barras nelas não quebram o código gerado.
+        """
+        linhas = ["def classificar(d):"]
+        for keyword, valor in keywords_planas:
+            linhas.append(f"    if {keyword!r} in d: return {valor!r}")
+        linhas.append("    return None")
+
+        namespace = {}
+        exec(compile("\n".join(linhas), f"<{cls.__name__}.classificar>", "exec"), namespace)
+        return namespace["classificar"]
+
+    @classmethod
+    def _buscar_assinatura(cls, descricao_lower: str) -> Optional[dict]:
+        """
+        Procura uma assinatura conhecida na descrição já em minúsculas.
+
+        Uma única varredura (Aho-Corasick, ou regex sem pyahocorasick) descarta
+        a maioria das descrições; quando há acerto, vale a regra de que vence
+        a primeira chave declarada em ASSINATURAS_CONHECIDAS.
+        """
+        if AHOCORASICK_AVAILABLE:
+            busca = cls._ASSINATURAS_AUTOMATON.iter(descricao_lower)
+            primeira = next(busca, None)
+            if primeira is None:
+                return None
+            _, chave = min([primeira[1], *(valor for _, valor in busca)])
+            return cls.ASSINATURAS_CONHECIDAS[chave]
+
+        encontrada = cls._ASSINATURAS_RE.search(descricao_lower)
+        if encontrada is None:
+            return None
+
+        chave = encontrada.group(0)
+        for key in cls._ASSINATURAS_CHAVES[:cls._ASSINATURAS_CHAVES.index(chave)]:
+            if key in descricao_lower:
+                chave = key
+                break
+        return cls.ASSINATURAS_CONHECIDAS[chave]
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _buscar_categoria(cls, descricao_lower: str) -> Optional[tuple]:
+        """
+        Busca a categoria de uma descrição já em minúsculas.
+
+        Vence a palavra-chave mais longa encontrada, a mais específica (ex.:
+        "amazon prime" em vez de "amazon"); em palavras do mesmo tamanho, vence
+        a categoria declarada primeiro em CATEGORIAS. O resultado fica em cache, já que extratos repetem muito os mesmos
+        estabelecimentos.
+
+        Returns:
+            Tupla (id, categoria, emoji) ou None se nenhuma palavra-chave
+            aparecer; o id é a posição da categoria em CATEGORIAS
+        """
+        if AHOCORASICK_AVAILABLE:
+            # Uma única varredura encontra todas as palavras-chave presentes;
+            # fica a de menor posição na lista plana
+            encontrada = min((valor for _, valor in cls._AC_AUTOMATON.iter(descricao_lower)), default=None)
+            return encontrada[1] if encontrada else None
+
+        # Testes gerados na ordem da lista plana: o primeiro acerto já é o vencedor
+        return cls._CLASSIFICAR_GERADO(descricao_lower)
+
+    def _varrer_transacoes(self, transacoes: List[Transacao], classificar: bool = True) -> "_Varredura":
+        """
+        Percorre as transações uma única vez, normalizando cada descrição e
+        valor e acumulando tudo o que as análises do extrato precisam.
+
+        Args:
+            transacoes: Lista de transações
+            classificar: Se False, pula a classificação por categoria
+
+        Returns:
+            Estruturas acumuladas para as análises de extrato, assinaturas e anomalias
+        """
+        v = _Varredura()
+        # descrição -> (assinatura conhecida ou None, descrição simplificada), só nesta
+        # varredura: descrições repetidas não refazem a busca nem a simplificação
+        resolvidas = {}
+
+        # Converte todos os valores de uma vez para um array contíguo
+        if NUMPY_AVAILABLE:
+            v.valores_array = np.fromiter(
+                (t.get("valor", 0) for t in transacoes), dtype=np.float64, count=len(transacoes)
+            )
+            v.valores = v.valores_array.tolist()
+        else:
+            v.valores = [float(t.get("valor", 0)) for t in transacoes]
+        v.total = sum(v.valores)
+
+        # Cada dict é lido uma única vez; daqui em diante tudo usa as colunas
+        v.descricoes = [t.get("descricao") for t in transacoes]
+        v.descricoes_lower = [_normalizar(desc or "") for desc in v.descricoes]
+
+        for desc_lower, valor in zip(v.descricoes_lower, v.valores):
+            resolvida = resolvidas.get(desc_lower)
+            if resolvida is None:
+                # Verificar assinaturas conhecidas
+                info = self._buscar_assinatura(desc_lower)
+                # Simplifica a descrição para agrupamento
+                resolvida = resolvidas[desc_lower] = (
+                    info,
+                    sys.intern(_DIGITOS_RE.sub('', desc_lower)[:30]) if info is None else None
+                )
+            info, desc_simplificada = resolvida
+            if info is not None:
+                v.assinaturas_encontradas.append({
+                    "servico": info["nome"],
+                    "valor": valor,
+                    "valor_tipico": f"R$ {info['valor_tipico'][0]} - R$ {info['valor_tipico'][1]}",
+                    "status": "✅ Valor normal" if info['valor_tipico'][0] <= valor <= info['valor_tipico'][1] else "⚠️ Valor diferente do típico"
+                })
+            else:
+                # Agrupar por descrição similar para detectar recorrências
+                rec = v.possiveis_recorrentes.get(desc_simplificada)
+                if rec is None:
+                    v.possiveis_recorrentes[desc_simplificada] = [1, valor, True, [valor]]
+                else:
+                    rec[0] += 1
+                    rec[2] = rec[2] and valor == rec[1]
+                    if len(rec[3]) < 5:
+                        rec[3].append(valor)
+
+        if classificar:
+            self._classificar_varredura(v)
+
+        return v
+
+    def _classificar_varredura(self, v: "_Varredura"):
+        """
+        Classifica as descrições da varredura e soma os gastos por categoria.
+
+        Em extratos grandes, pd.factorize agrupa as descrições repetidas e cada
+        descrição distinta é classificada uma única vez; os ids voltam para
+        as transações por indexação do array de códigos.
+        """
+        id_outros = len(self.CATEGORIAS)
+
+        if PANDAS_AVAILABLE and len(v.descricoes_lower) >= _MIN_TRANSACOES_PANDAS:
+            codigos, unicas = pd.factorize(pd.Series(v.descricoes_lower, dtype="object"))
+            encontradas = [self._buscar_categoria(d) for d in unicas]
+            ids_unicos = np.fromiter(
+                (e[0] if e else id_outros for e in encontradas), dtype=np.intp, count=len(encontradas)
+            )
+            categoria_ids = ids_unicos[codigos]
+            primeiras = [encontradas[c] for c in codigos[:_MAX_CLASSIFICADAS_DETALHADAS]]
+        else:
+            encontradas = [self._buscar_categoria(d) for d in v.descricoes_lower]
+            categoria_ids = [e[0] if e else id_outros for e in encontradas]
+            primeiras = encontradas[:_MAX_CLASSIFICADAS_DETALHADAS]
+
+        # Só as primeiras transações viram dicionários detalhados
+        v.classificadas = [
+            self._montar_classificacao("" if desc is None else desc, valor, encontrada)
+            for desc, valor, encontrada in zip(v.descricoes, v.valores, primeiras)
+        ]
+        v.gastos_categoria = self._somar_por_categoria(categoria_ids, v)
+
+    def _somar_por_categoria(self, categoria_ids: List[int], v: "_Varredura") -> Counter:
+        """
+        Soma os valores por id de categoria.
+
+        Com numpy, a soma é um único np.bincount sobre o array de valores.
+        As categorias saem na ordem em que apareceram no extrato, como no
+        acumulador por nome que esta soma substitui.
+        """
+        nomes = self._NOMES_CATEGORIAS
+
+        if v.valores_array is not None:
+            ids = np.asarray(categoria_ids, dtype=np.intp)
+            somas = np.bincount(ids, weights=v.valores_array, minlength=len(nomes)).tolist()
+            presentes, primeira_posicao = np.unique(ids, return_index=True)
+            ordem = presentes[np.argsort(primeira_posicao, kind="stable")].tolist()
+        else:
+            somas = [0.0] * len(nomes)
+            for cat_id, valor in zip(categoria_ids, v.valores):
+                somas[cat_id] += valor
+            ordem = dict.fromkeys(categoria_ids)
+
+        return Counter({nomes[i]: somas[i] for i in ordem})
+
     def analisar_extrato_manual(self, transacoes: List[Transacao]) -> dict:
         """
         Analisa uma lista de transações fornecidas manualmente.
@@ -179,45 +525,31 @@ class CartoesTools:
         if not transacoes:
             return {"erro": "Nenhuma transação fornecida"}
 
-        # Classificar todas as transações
-        classificadas = []
-        gastos_categoria = defaultdict(float)
-        total = 0
-
-        for t in transacoes:
-            desc = t.get("descricao", "")
-            valor = float(t.get("valor", 0))
+        return self._resumir_extrato(self._varrer_transacoes(transacoes))
 
-            classificacao = self.classificar_transacao(desc, valor)
-            classificadas.append(classificacao)
+    def _resumir_extrato(self, v: "_Varredura") -> dict:
+        """Monta a análise do extrato a partir de uma varredura já feita"""
+        total = v.total
+        num_transacoes = len(v.valores)
 
-            gastos_categoria[classificacao["categoria"]] += valor
-            total += valor
-
-        # Ordenar categorias por valor
-        categorias_ordenadas = sorted(
-            gastos_categoria.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        # Calcular percentuais
+        # Categorias por valor (most_common mantém a ordem de aparição nos empates)
+        # e percentuais calculados na mesma passada
         resumo_categorias = []
-        for cat, valor in categorias_ordenadas:
-            emoji = self.CATEGORIAS.get(cat, {}).get("emoji", "❓")
+        rotulos = self._ROTULOS_CATEGORIAS
+        for cat, valor in v.gastos_categoria.most_common():
             percentual = (valor / total * 100) if total > 0 else 0
             resumo_categorias.append({
-                "categoria": f"{emoji} {cat.replace('_', ' ').title()}",
+                "categoria": rotulos[cat],
                 "valor": round(valor, 2),
                 "percentual": f"{percentual:.1f}%"
             })
 
         return {
             "total_gastos": round(total, 2),
-            "num_transacoes": len(transacoes),
-            "ticket_medio": round(total / len(transacoes), 2) if transacoes else 0,
+            "num_transacoes": num_transacoes,
+            "ticket_medio": round(total / num_transacoes, 2) if num_transacoes else 0,
             "resumo_por_categoria": resumo_categorias,
-            "transacoes_classificadas": classificadas[:20],  # Limitar para não sobrecarregar
+            "transacoes_classificadas": v.classificadas,  # Já limitado na varredura
             "observacao": "Análise baseada em palavras-chave. Revise categorias marcadas com baixa confiança."
         }
 
@@ -231,44 +563,29 @@ class CartoesTools:
         Returns:
             Lista de possíveis assinaturas encontradas
         """
-        assinaturas_encontradas = []
-        possiveis_recorrentes = defaultdict(list)
-
-        for t in transacoes:
-            desc = t.get("descricao", "").lower()
-            valor = float(t.get("valor", 0))
-
-            # Verificar assinaturas conhecidas
-            for key, info in self.ASSINATURAS_CONHECIDAS.items():
-                if key in desc:
-                    assinaturas_encontradas.append({
-                        "servico": info["nome"],
-                        "valor": valor,
-                        "valor_tipico": f"R$ {info['valor_tipico'][0]} - R$ {info['valor_tipico'][1]}",
-                        "status": "✅ Valor normal" if info['valor_tipico'][0] <= valor <= info['valor_tipico'][1] else "⚠️ Valor diferente do típico"
-                    })
-                    break
-            else:
-                # Agrupar por descrição similar para detectar recorrências
-                # Simplifica a descrição para agrupamento
-                desc_simplificada = re.sub(r'\d+', '', desc)[:30]
-                possiveis_recorrentes[desc_simplificada].append(valor)
+        return self._resumir_assinaturas(self._varrer_transacoes(transacoes, classificar=False))
 
+    def _resumir_assinaturas(self, v: "_Varredura") -> dict:
+        """Monta a análise de assinaturas a partir de uma varredura já feita"""
         # Identificar possíveis recorrências (mesmo valor ou descrição repetida)
+        # Contagem, amostra e "todos iguais" já vêm agregados da varredura;
+        # só os grupos exibidos viram dicionários
         recorrencias_suspeitas = []
-        for desc, valores in possiveis_recorrentes.items():
-            if len(valores) >= 2:
+        for desc, (ocorrencias, _, todos_iguais, amostra) in v.possiveis_recorrentes.items():
+            if ocorrencias >= 2:
                 recorrencias_suspeitas.append({
                     "descricao": desc.strip(),
-                    "ocorrencias": len(valores),
-                    "valores": valores[:5],
-                    "possivel_assinatura": len(set(valores)) == 1
+                    "ocorrencias": ocorrencias,
+                    "valores": amostra,
+                    "possivel_assinatura": todos_iguais
                 })
+                if len(recorrencias_suspeitas) == _MAX_RECORRENCIAS:
+                    break
 
         return {
-            "assinaturas_identificadas": assinaturas_encontradas,
-            "total_assinaturas": round(sum(a["valor"] for a in assinaturas_encontradas), 2),
-            "possiveis_recorrencias": recorrencias_suspeitas[:10],
+            "assinaturas_identificadas": v.assinaturas_encontradas,
+            "total_assinaturas": round(sum(a["valor"] for a in v.assinaturas_encontradas), 2),
+            "possiveis_recorrencias": recorrencias_suspeitas,
             "dica": "Revise assinaturas que você não usa mais. Pequenos valores mensais somam ao longo do ano!"
         }
 
@@ -282,59 +599,49 @@ class CartoesTools:
         Returns:
             Lista de anomalias encontradas
         """
-        alertas = []
-
-        # Agrupar transações por descrição para encontrar duplicatas
-        por_descricao = defaultdict(list)
-        valores = []
+        return self._resumir_anomalias(self._varrer_transacoes(transacoes, classificar=False))
 
-        for t in transacoes:
-            desc = t.get("descricao", "")
-            valor = float(t.get("valor", 0))
-            valores.append(valor)
-            por_descricao[desc.lower()].append(valor)
+    def _resumir_anomalias(self, v: "_Varredura") -> dict:
+        """Monta a análise de anomalias a partir de uma varredura já feita"""
+        alertas = []
+        valores = v.valores
 
         # Calcular média e desvio para detectar outliers
         if valores:
-            media = sum(valores) / len(valores)
-            # Outliers: valores muito acima da média
-            for t in transacoes:
-                valor = float(t.get("valor", 0))
-                if valor > media * 3 and valor > 500:  # 3x a média e acima de R$ 500
-                    alertas.append({
-                        "tipo": "🔴 Valor Alto",
-                        "descricao": t.get("descricao"),
-                        "valor": valor,
-                        "motivo": f"Valor {valor/media:.1f}x acima da média do extrato"
-                    })
+            # Outliers: valores muito acima da média (3x a média e acima de R$ 500)
+            if v.valores_array is not None:
+                arr = v.valores_array
+                media = v.total / len(valores)
+                outliers = np.flatnonzero((arr > media * 3) & (arr > 500)).tolist()
+            else:
+                media = v.total / len(valores)
+                outliers = [i for i, valor in enumerate(valores) if valor > media * 3 and valor > 500]
+
+            for i in outliers:
+                valor = valores[i]
+                alertas.append({
+                    "tipo": "🔴 Valor Alto",
+                    "descricao": v.descricoes[i],
+                    "valor": valor,
+                    "motivo": f"Valor {valor/media:.1f}x acima da média do extrato"
+                })
 
         # Detectar possíveis duplicatas
-        for desc, vals in por_descricao.items():
-            if len(vals) >= 2:
-                # Mesma descrição e mesmo valor = possível duplicata
-                valor_counts = defaultdict(int)
-                for v in vals:
-                    valor_counts[v] += 1
-
-                for v, count in valor_counts.items():
-                    if count >= 2:
-                        alertas.append({
-                            "tipo": "⚠️ Possível Duplicata",
-                            "descricao": desc,
-                            "valor": v,
-                            "ocorrencias": count,
-                            "motivo": "Mesma descrição e valor aparece múltiplas vezes"
-                        })
+        for desc, val, count in self._duplicatas(v):
+            alertas.append({
+                "tipo": "⚠️ Possível Duplicata",
+                "descricao": desc,
+                "valor": val,
+                "ocorrencias": count,
+                "motivo": "Mesma descrição e valor aparece múltiplas vezes"
+            })
 
         # Detectar cobranças de serviços financeiros (taxas, juros)
-        for t in transacoes:
-            desc = t.get("descricao", "").lower()
-            valor = float(t.get("valor", 0))
-
-            if any(word in desc for word in ["juros", "multa", "encargo", "iof", "tarifa"]):
+        for desc, desc_lower, valor in zip(v.descricoes, v.descricoes_lower, valores):
+            if _TAXA_RE.search(desc_lower):
                 alertas.append({
                     "tipo": "💰 Taxa/Encargo",
-                    "descricao": t.get("descricao"),
+                    "descricao": desc,
                     "valor": valor,
                     "motivo": "Cobrança de serviço financeiro identificada"
                 })
@@ -345,6 +652,42 @@ class CartoesTools:
             "recomendacao": "Verifique os alertas e contate o banco se identificar cobranças indevidas"
         }
 
+    @staticmethod
+    def _duplicatas(v: "_Varredura") -> List[tuple]:
+        """
+        Lista (descricao, valor, ocorrencias) dos pares repetidos.
+
+        A ordem segue a primeira aparição da descrição e, dentro dela, a
+        primeira aparição do valor. Em extratos grandes a contagem é feita
+        com groupby do pandas (chave como object, não category).
+        """
+        if PANDAS_AVAILABLE and len(v.valores) >= _MIN_TRANSACOES_PANDAS:
+            df = pd.DataFrame({
+                "descricao": pd.Series(v.descricoes_lower, dtype="object"),
+                "valor": pd.Series(v.valores if v.valores_array is None else v.valores_array, dtype="float64"),
+            })
+            df["ordem"] = pd.factorize(df["descricao"])[0]
+            contagem = df.groupby(["ordem", "descricao", "valor"], sort=False).size()
+            contagem = contagem[contagem >= 2]
+            # groupby sem sort preserva a primeira aparição de cada par;
+            # a ordenação estável por descrição reproduz o agrupamento por descrição
+            contagem = contagem.sort_index(level="ordem", kind="stable", sort_remaining=False)
+            return [
+                (desc, float(val), int(count))
+                for (_, desc, val), count in contagem.items()
+            ]
+
+        # Counter conta os pares em C; mesma descrição e mesmo valor = possível duplicata
+        duplicatas = [
+            (desc, val, count)
+            for (desc, val), count in Counter(zip(v.descricoes_lower, v.valores)).items()
+            if count >= 2
+        ]
+        if duplicatas:
+            ordem = {desc: i for i, desc in enumerate(dict.fromkeys(v.descricoes_lower))}
+            duplicatas.sort(key=lambda d: ordem[d[0]])
+        return duplicatas
+
     def analisar_uso_limite(
         self,
         limite_total: float,
@@ -421,8 +764,7 @@ class CartoesTools:
         """
         if taxa_juros_mensal > 0:
             # Com juros (Price)
-            taxa = taxa_juros_mensal / 100
-            parcela = valor_total * (taxa * (1 + taxa)**num_parcelas) / ((1 + taxa)**num_parcelas - 1)
+            parcela = _parcela_price(valor_total, num_parcelas, taxa_juros_mensal / 100)
             total_pago = parcela * num_parcelas
             juros_total = total_pago - valor_total
         else:
@@ -443,6 +785,75 @@ class CartoesTools:
             "dica": "Parcelamentos sem juros são interessantes se você teria o dinheiro guardado rendendo. Com juros, evite!"
         }
 
+    def simular_parcelamento_lote(
+        self,
+        valores_totais: List[float],
+        nums_parcelas: List[int],
+        taxas_juros_mensais: List[float]
+    ) -> dict:
+        """
+        Simula vários parcelamentos de uma vez (ex: comparar 3x, 6x, 10x e 12x).
+
+        As listas são pareadas por posição; a fórmula Price é aplicada a todos
+        os cenários de uma vez com NumPy quando disponível.
+
+        Args:
+            valores_totais: Valores totais das compras
+            nums_parcelas: Números de parcelas
+            taxas_juros_mensais: Taxas de juros mensais (0 = sem juros)
+
+        Returns:
+            Lista de simulações, na mesma ordem das entradas
+        """
+        if not (len(valores_totais) == len(nums_parcelas) == len(taxas_juros_mensais)):
+            return {"erro": "As listas de valores, parcelas e taxas devem ter o mesmo tamanho"}
+
+        # Validado antes de escolher o caminho: NumPy e Python puro recebem a
+        # mesma entrada (sem truncar 3.7 parcelas nem devolver inf para 0)
+        for num in nums_parcelas:
+            if num < 1 or num != int(num):
+                return {"erro": f"Número de parcelas inválido: {num}. Use um inteiro maior ou igual a 1"}
+
+        if NUMPY_AVAILABLE:
+            v = np.asarray(valores_totais, dtype=np.float64)
+            n = np.asarray(nums_parcelas, dtype=np.int64)
+            taxa = np.asarray(taxas_juros_mensais, dtype=np.float64) / 100
+            com_juros = taxa > 0
+
+            fator = (1 + taxa) ** n
+            with np.errstate(divide="ignore", invalid="ignore"):
+                parcelas = np.where(com_juros, v * (taxa * fator) / (fator - 1), v / n)
+            totais = np.where(com_juros, parcelas * n, v)
+            parcelas, totais = parcelas.tolist(), totais.tolist()
+        else:
+            parcelas, totais = [], []
+            for valor, num, taxa_mensal in zip(valores_totais, nums_parcelas, taxas_juros_mensais):
+                if taxa_mensal > 0:
+                    parcela = _parcela_price(valor, num, taxa_mensal / 100)
+                    parcelas.append(parcela)
+                    totais.append(parcela * num)
+                else:
+                    parcelas.append(valor / num)
+                    totais.append(valor)
+
+        simulacoes = []
+        for valor, num, taxa_mensal, parcela, total_pago in zip(
+            valores_totais, nums_parcelas, taxas_juros_mensais, parcelas, totais
+        ):
+            simulacoes.append({
+                "valor_compra": valor,
+                "num_parcelas": num,
+                "taxa_juros": f"{taxa_mensal}% a.m." if taxa_mensal > 0 else "Sem juros",
+                "valor_parcela": round(parcela, 2),
+                "total_a_pagar": round(total_pago, 2),
+                "juros_total": round(total_pago - valor, 2)
+            })
+
+        return {
+            "simulacoes": simulacoes,
+            "total_simulacoes": len(simulacoes)
+        }
+
     def gerar_relatorio_mensal(
         self,
         transacoes: List[Transacao],
@@ -460,10 +871,16 @@ class CartoesTools:
         Returns:
             Relatório mensal completo
         """
-        # Análise básica
-        analise = self.analisar_extrato_manual(transacoes)
-        assinaturas = self.detectar_assinaturas(transacoes)
-        anomalias = self.detectar_anomalias(transacoes)
+        # Uma única passada alimenta as três análises
+        if not transacoes:
+            analise = self.analisar_extrato_manual(transacoes)
+            assinaturas = self.detectar_assinaturas(transacoes)
+            anomalias = self.detectar_anomalias(transacoes)
+        else:
+            varredura = self._varrer_transacoes(transacoes)
+            analise = self._resumir_extrato(varredura)
+            assinaturas = self._resumir_assinaturas(varredura)
+            anomalias = self._resumir_anomalias(varredura)
 
         relatorio = {
             "periodo": "Mensal",
@@ -575,28 +992,40 @@ class CartoesTools:
         self._credentials = creds
         return creds
 
+    def _get_servico(self, nome: str, versao: str):
+        """
+        Retorna o cliente de uma API do Google, compartilhado entre instâncias.
+
+        O cache é do módulo, por API e conta (client_id + refresh_token), então
+        novas instâncias de CartoesTools não reconstroem o cliente. O objeto
+        de credenciais guardado no cliente se renova sozinho quando expira.
+        """
+        creds = self._get_credentials()
+        if not creds:
+            return None
+
+        chave = (nome, versao, getattr(creds, "client_id", None), getattr(creds, "refresh_token", None))
+        servico = _SERVICOS_GOOGLE.get(chave)
+        if servico is None:
+            servico = _SERVICOS_GOOGLE[chave] = build(nome, versao, credentials=creds, cache_discovery=False)
+        return servico
+
     def _get_gmail(self):
         """Retorna serviço Gmail (lazy-load)"""
         if not self._gmail_service:
-            creds = self._get_credentials()
-            if creds:
-                self._gmail_service = build('gmail', 'v1', credentials=creds)
+            self._gmail_service = self._get_servico('gmail', 'v1')
         return self._gmail_service
 
     def _get_drive(self):
         """Retorna serviço Drive (lazy-load)"""
         if not self._drive_service:
-            creds = self._get_credentials()
-            if creds:
-                self._drive_service = build('drive', 'v3', credentials=creds)
+            self._drive_service = self._get_servico('drive', 'v3')
         return self._drive_service
 
     def _get_sheets(self):
         """Retorna serviço Sheets (lazy-load)"""
         if not self._sheets_service:
-            creds = self._get_credentials()
-            if creds:
-                self._sheets_service = build('sheets', 'v4', credentials=creds)
+            self._sheets_service = self._get_servico('sheets', 'v4')
         return self._sheets_service
 
     def _extrair_transacoes_csv(self, file_content: bytes) -> List[Dict]:
@@ -616,41 +1045,61 @@ class CartoesTools:
             Lista de dicts com 'data', 'descricao', 'valor', 'categoria_nubank'
         """
         transacoes = []
-        try:
-            # Tentar decodificar com utf-8, fallback para latin-1
+        # Decodifica em streaming sobre os bytes, sem montar o texto inteiro
+        # (nem a cópia UCS-4 que o StringIO faria); utf-8 com fallback para latin-1
+        for encoding in ('utf-8', 'latin-1'):
+            texto = io.TextIOWrapper(io.BytesIO(file_content), encoding=encoding, newline='\n')
+            transacoes = []
             try:
-                text = file_content.decode('utf-8')
+                self._ler_transacoes_csv(texto, transacoes)
             except UnicodeDecodeError:
-                text = file_content.decode('latin-1')
-
-            reader = csv.DictReader(io.StringIO(text))
-
-            for row in reader:
-                # Colunas padrão Nubank CSV: date, category, title, amount
-                data = row.get('date', '').strip()
-                categoria_nu = row.get('category', '').strip()
-                descricao = row.get('title', '').strip()
-                valor_str = row.get('amount', '0').strip()
-
-                if not descricao or not valor_str:
-                    continue
-
+                continue
+            except Exception:
+                # Linha malformada: valem as transações lidas até ela, desde que o
+                # restante do arquivo também seja utf-8 (senão tudo é relido em latin-1)
                 try:
-                    valor = abs(float(valor_str.replace(',', '.')))
-                except ValueError:
+                    for _ in texto:
+                        pass
+                except UnicodeDecodeError:
                     continue
+            break
 
-                transacoes.append({
-                    "data": data,
-                    "descricao": descricao,
-                    "valor": valor,
-                    "categoria_nubank": categoria_nu
-                })
+        return transacoes
 
-        except Exception:
-            pass
+    @staticmethod
+    def _ler_transacoes_csv(linhas, transacoes: List[Dict]) -> None:
+        """Lê as linhas do CSV Nubank, acrescentando as transações válidas em transacoes"""
+        # csv.reader + posições das colunas evita montar um dict por linha
+        reader = csv.reader(linhas)
+        cabecalho = next(reader, [])
+        posicoes = {nome: i for i, nome in enumerate(cabecalho)}  # repetida: vale a última, como no DictReader
+        i_data = posicoes.get('date')
+        i_categoria = posicoes.get('category')
+        i_descricao = posicoes.get('title')
+        i_valor = posicoes.get('amount')
+        append = transacoes.append
+
+        for row in reader:
+            if not row:
+                continue  # linhas em branco são ignoradas, como no DictReader
+            # Colunas padrão Nubank CSV: date, category, title, amount
+            descricao = row[i_descricao].strip() if i_descricao is not None else ''
+            valor_str = row[i_valor].strip() if i_valor is not None else '0'
+
+            if not descricao or not valor_str:
+                continue
 
-        return transacoes
+            try:
+                valor = abs(float(valor_str.replace(',', '.')))
+            except ValueError:
+                continue
+
+            append({
+                "data": row[i_data].strip() if i_data is not None else '',
+                "descricao": descricao,
+                "valor": valor,
+                "categoria_nubank": row[i_categoria].strip() if i_categoria is not None else ''
+            })
 
     def _registrar_na_planilha(self, transacoes_classificadas: List[Dict], mes_ref: str) -> dict:
         """
@@ -677,45 +1126,73 @@ class CartoesTools:
         aba = f"Cartão {mes_ref}"
 
         try:
-            # Verificar se aba existe, senão criar
-            spreadsheet = sheets.spreadsheets().get(
-                spreadsheetId=sheets_id
-            ).execute()
+            # Abas já vistas nesta planilha ficam em cache; só a primeira gravação consulta a API
+            abas_existentes = self._abas_planilha.get(sheets_id)
+            if abas_existentes is None:
+                spreadsheet = sheets.spreadsheets().get(
+                    spreadsheetId=sheets_id,
+                    fields="sheets.properties(title,sheetId)"
+                ).execute()
+                abas_existentes = {
+                    s['properties']['title']: s['properties']['sheetId']
+                    for s in spreadsheet.get('sheets', [])
+                }
+                self._abas_planilha[sheets_id] = abas_existentes
 
-            abas_existentes = [s['properties']['title'] for s in spreadsheet.get('sheets', [])]
+            # Preparar linhas (valor numérico; a formatação em reais fica com a coluna)
+            rows = [
+                [
+                    t.get("data", ""),
+                    t.get("descricao", ""),
+                    round(t.get("valor", 0), 2),
+                    t.get("categoria", "outros"),
+                    t.get("categoria_nubank", ""),
+                ]
+                for t in transacoes_classificadas
+            ]
 
             if aba not in abas_existentes:
+                # Cria a aba e formata a coluna Valor como moeda na mesma chamada
+                sheet_id = max(abas_existentes.values(), default=0) + 1
                 sheets.spreadsheets().batchUpdate(
                     spreadsheetId=sheets_id,
                     body={
-                        "requests": [{
-                            "addSheet": {
-                                "properties": {"title": aba}
+                        "requests": [
+                            {
+                                "addSheet": {
+                                    "properties": {"title": aba, "sheetId": sheet_id}
+                                }
+                            },
+                            {
+                                "repeatCell": {
+                                    "range": {
+                                        "sheetId": sheet_id,
+                                        "startRowIndex": 1,
+                                        "startColumnIndex": 2,
+                                        "endColumnIndex": 3
+                                    },
+                                    "cell": {
+                                        "userEnteredFormat": {
+                                            "numberFormat": {"type": "CURRENCY", "pattern": "R$ #,##0.00"}
+                                        }
+                                    },
+                                    "fields": "userEnteredFormat.numberFormat"
+                                }
                             }
-                        }]
+                        ]
                     }
                 ).execute()
+                abas_existentes[aba] = sheet_id
 
-                # Escrever cabeçalho
+                # Aba nova: cabeçalho e linhas em uma única escrita
                 sheets.spreadsheets().values().update(
                     spreadsheetId=sheets_id,
-                    range=f"'{aba}'!A1:E1",
+                    range=f"'{aba}'!A1",
                     valueInputOption="USER_ENTERED",
-                    body={"values": [["Data", "Descrição", "Valor", "Categoria", "Categoria Nubank"]]}
+                    body={"values": [["Data", "Descrição", "Valor", "Categoria", "Categoria Nubank"]] + rows}
                 ).execute()
 
-            # Preparar linhas
-            rows = []
-            for t in transacoes_classificadas:
-                rows.append([
-                    t.get("data", ""),
-                    t.get("descricao", ""),
-                    f"{t.get('valor', 0):.2f}".replace('.', ','),
-                    t.get("categoria", "outros"),
-                    t.get("categoria_nubank", ""),
-                ])
-
-            if rows:
+            elif rows:
                 sheets.spreadsheets().values().append(
                     spreadsheetId=sheets_id,
                     range=f"'{aba}'!A2",
@@ -731,8 +1208,98 @@ class CartoesTools:
             }
 
         except Exception as e:
+            # A planilha pode ter mudado por fora (aba apagada); consulta de novo na próxima vez
+            self._abas_planilha.pop(sheets_id, None)
             return {"erro": str(e)}
 
+    @staticmethod
+    def _executar_em_lote(gmail, requisicoes: List) -> List[dict]:
+        """
+        Executa chamadas da API do Gmail em requisições HTTP em lote.
+
+        Cada lote leva até _GMAIL_LOTE chamadas em uma única ida ao servidor.
+        Um cliente de API não pode ser compartilhado entre threads, então o
+        lote é a forma de sobrepor a latência das chamadas.
+
+        Returns:
+            Respostas na mesma ordem das requisições
+        """
+        respostas = {}
+        erros = []
+
+        def _coletar(request_id, response, exception):
+            if exception is not None:
+                erros.append(exception)
+            else:
+                respostas[request_id] = response
+
+        for inicio in range(0, len(requisicoes), _GMAIL_LOTE):
+            batch = gmail.new_batch_http_request(callback=_coletar)
+            for i, requisicao in enumerate(requisicoes[inicio:inicio + _GMAIL_LOTE], start=inicio):
+                batch.add(requisicao, request_id=str(i))
+            batch.execute()
+            if erros:
+                raise erros[0]
+
+        return [respostas[str(i)] for i in range(len(requisicoes))]
+
+    def _obter_mensagens(self, gmail, message_ids: List[str]) -> List[dict]:
+        """Busca as mensagens em lote, trazendo só cabeçalhos e anexos"""
+        return self._executar_em_lote(gmail, [
+            gmail.users().messages().get(
+                userId='me',
+                id=message_id,
+                format='full',
+                fields=_GMAIL_CAMPOS_MENSAGEM
+            )
+            for message_id in message_ids
+        ])
+
+    @staticmethod
+    def _parte_csv(part: dict) -> bool:
+        """Indica se a parte da mensagem é um anexo CSV baixável"""
+        filename = part.get('filename', '')
+        if not filename or not filename.lower().endswith('.csv'):
+            return False
+        return 'body' in part and 'attachmentId' in part['body']
+
+    def _iterar_partes_csv(self, mensagens: List[dict]):
+        """Percorre os anexos CSV baixáveis de todas as mensagens"""
+        for msg in mensagens:
+            for part in msg['payload'].get('parts', []):
+                if self._parte_csv(part):
+                    yield part
+
+    @staticmethod
+    def _listar_nomes_drive(drive, folder_id: str, nomes_base) -> List[str]:
+        """
+        Busca, em uma consulta só, os arquivos da pasta cujo nome contém algum
+        dos nomes base, no lugar de uma consulta por arquivo.
+
+        Returns:
+            Nomes encontrados, em minúsculas
+        """
+        if not nomes_base:
+            return []
+
+        condicoes = " or ".join(
+            "name contains '{}'".format(nome.replace("\\", "\\\\").replace("'", "\\'"))
+            for nome in sorted(nomes_base)
+        )
+        nomes = []
+        page_token = None
+        while True:
+            resposta = drive.files().list(
+                q=f"'{folder_id}' in parents and ({condicoes})",
+                fields="nextPageToken, files(name)",
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
+            nomes.extend(f['name'].lower() for f in resposta.get('files', []))
+            page_token = resposta.get('nextPageToken')
+            if not page_token:
+                return nomes
+
     def buscar_extratos_nubank(self, apenas_nao_lidos: bool = True, limite: int = 10) -> dict:
         """
         Busca emails da Nubank com extratos CSV anexados no Gmail.
@@ -773,13 +1340,8 @@ class CartoesTools:
                 }
 
             emails_info = []
-            for message in messages:
-                msg = gmail.users().messages().get(
-                    userId='me',
-                    id=message['id'],
-                    format='full'
-                ).execute()
-
+            mensagens = self._obter_mensagens(gmail, [m['id'] for m in messages])
+            for message, msg in zip(messages, mensagens):
                 headers = {h['name']: h['value'] for h in msg['payload']['headers']}
 
                 anexos = []
@@ -865,15 +1427,35 @@ class CartoesTools:
 
             csvs_enviados = []
             todas_transacoes = []
-            emails_processados = 0
+            ids_processados = []
+
+            mensagens = self._obter_mensagens(gmail, [m['id'] for m in messages])
 
-            for message in messages:
-                msg = gmail.users().messages().get(
+            # Baixar todos os anexos CSV do Gmail de uma vez, em lote
+            pendentes = [
+                (message['id'], part['body']['attachmentId'])
+                for message, msg in zip(messages, mensagens)
+                for part in msg['payload'].get('parts', [])
+                if self._parte_csv(part)
+            ]
+            anexos = dict(zip(pendentes, self._executar_em_lote(gmail, [
+                gmail.users().messages().attachments().get(
                     userId='me',
-                    id=message['id'],
-                    format='full'
-                ).execute()
+                    messageId=message_id,
+                    id=attachment_id,
+                    fields='data'
+                )
+                for message_id, attachment_id in pendentes
+            ])))
+
+            # Uma única consulta ao Drive cobre todos os CSVs candidatos
+            nomes_no_drive = self._listar_nomes_drive(
+                drive,
+                folder_id,
+                {part['filename'].rsplit('.', 1)[0] for part in self._iterar_partes_csv(mensagens)}
+            )
 
+            for message, msg in zip(messages, mensagens):
                 headers = {h['name']: h['value'] for h in msg['payload']['headers']}
                 assunto = headers.get('Subject', 'Sem assunto')
 
@@ -881,30 +1463,17 @@ class CartoesTools:
                 email_tem_csv = False
 
                 for part in parts:
-                    filename = part.get('filename', '')
-                    if not filename or not filename.lower().endswith('.csv'):
-                        continue
-
-                    if not ('body' in part and 'attachmentId' in part['body']):
+                    if not self._parte_csv(part):
                         continue
 
-                    # Baixar anexo CSV do Gmail
-                    attachment = gmail.users().messages().attachments().get(
-                        userId='me',
-                        messageId=message['id'],
-                        id=part['body']['attachmentId']
-                    ).execute()
+                    filename = part['filename']
+                    attachment = anexos[(message['id'], part['body']['attachmentId'])]
 
                     file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
 
-                    # Verificar se já existe no Drive
-                    nome_base = filename.rsplit('.', 1)[0]
-                    existing = drive.files().list(
-                        q=f"'{folder_id}' in parents and name contains '{nome_base}'",
-                        fields="files(id, name)"
-                    ).execute()
-
-                    if not existing.get('files'):
+                    # Verificar se já existe no Drive (nomes consultados antes do laço)
+                    nome_base = filename.rsplit('.', 1)[0].lower()
+                    if not any(nome_base in nome for nome in nomes_no_drive):
                         # Upload CSV para o Drive
                         file_metadata = {
                             'name': filename,
@@ -912,10 +1481,12 @@ class CartoesTools:
                             'parents': [folder_id]
                         }
 
+                        # CSVs pequenos sobem num único POST multipart; o protocolo
+                        # resumível (sessão + chunks) só compensa para arquivos grandes
                         media = MediaIoBaseUpload(
                             io.BytesIO(file_data),
                             mimetype='text/csv',
-                            resumable=True
+                            resumable=len(file_data) > _DRIVE_UPLOAD_SIMPLES_MAX
                         )
 
                         uploaded = drive.files().create(
@@ -924,6 +1495,7 @@ class CartoesTools:
                             fields='id,name,webViewLink'
                         ).execute()
 
+                        nomes_no_drive.append(filename.lower())
                         csvs_enviados.append({
                             "nome": uploaded.get('name'),
                             "id": uploaded.get('id'),
@@ -937,14 +1509,19 @@ class CartoesTools:
 
                     email_tem_csv = True
 
-                # Marcar email como lido
                 if email_tem_csv:
-                    gmail.users().messages().modify(
-                        userId='me',
-                        id=message['id'],
-                        body={'removeLabelIds': ['UNREAD']}
-                    ).execute()
-                    emails_processados += 1
+                    ids_processados.append(message['id'])
+
+            # Marcar emails como lidos, vários por chamada
+            for inicio in range(0, len(ids_processados), _GMAIL_MODIFICAR_LOTE):
+                gmail.users().messages().batchModify(
+                    userId='me',
+                    body={
+                        'ids': ids_processados[inicio:inicio + _GMAIL_MODIFICAR_LOTE],
+                        'removeLabelIds': ['UNREAD']
+                    }
+                ).execute()
+            emails_processados = len(ids_processados)
 
             # === Classificar transações e gerar análise ===
             if not todas_transacoes:
@@ -957,10 +1534,15 @@ class CartoesTools:
                     "mensagem": "CSVs processados mas nenhuma transação extraída. Verifique o formato do CSV."
                 }
 
+            # Uma única varredura normaliza as descrições para a planilha e as análises
+            varredura = self._varrer_transacoes(todas_transacoes)
+
             # Classificar cada transação
             transacoes_classificadas = []
-            for t in todas_transacoes:
-                classificacao = self.classificar_transacao(t["descricao"], t["valor"])
+            for t, desc_lower in zip(todas_transacoes, varredura.descricoes_lower):
+                classificacao = self._montar_classificacao(
+                    t["descricao"], t["valor"], self._buscar_categoria(desc_lower)
+                )
                 transacoes_classificadas.append({
                     **t,
                     "categoria": classificacao["categoria"],
@@ -969,20 +1551,19 @@ class CartoesTools:
                 })
 
             # Detectar mês de referência a partir das datas
-            meses = set()
-            for t in todas_transacoes:
-                data = t.get("data", "")
-                if len(data) >= 7:  # "YYYY-MM" ou "YYYY-MM-DD"
-                    meses.add(data[:7])
-            mes_ref = sorted(meses)[-1] if meses else datetime.now().strftime("%Y-%m")
+            # ("YYYY-MM" ou "YYYY-MM-DD"; basta o maior mês, sem montar e ordenar o conjunto)
+            mes_ref = max(
+                (data[:7] for data in (t.get("data", "") for t in todas_transacoes) if len(data) >= 7),
+                default=None,
+            ) or datetime.now().strftime("%Y-%m")
 
             # Gravar na planilha
             resultado_planilha = self._registrar_na_planilha(transacoes_classificadas, mes_ref)
 
             # Análises
-            analise_extrato = self.analisar_extrato_manual(todas_transacoes)
-            analise_assinaturas = self.detectar_assinaturas(todas_transacoes)
-            analise_anomalias = self.detectar_anomalias(todas_transacoes)
+            analise_extrato = self._resumir_extrato(varredura)
+            analise_assinaturas = self._resumir_assinaturas(varredura)
+            analise_anomalias = self._resumir_anomalias(varredura)
 
             return {
                 "status": "ok",
@@ -1004,3 +1585,6 @@ class CartoesTools:
 
         except Exception as e:
             return {"erro": str(e)}
+
+
+CartoesTools._preparar_indices()
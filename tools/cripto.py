@@ -2,11 +2,59 @@
 Tools para análise de criptoativos e blockchain
 Foco em segurança, infraestrutura e gestão de risco
 """
+import threading
+import time
+import numpy as np
 import yfinance as yf
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 
+# Cache com expiração das consultas ao Yahoo: ticker -> (instante, valor)
+_INFO_CACHE = {}
+_HIST_CACHE = {}
+_INFO_TTL = 60  # segundos; o info muda na escala de minutos
+_HIST_TTL = 300  # histórico diário de 1 ano
+_CACHE_MAX = 128
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_obter(cache: dict, ticker: str, ttl: float):
+    """Valor guardado para o ticker, ou None se ausente ou expirado."""
+    item = cache.get(ticker)
+    if item is not None and time.monotonic() - item[0] < ttl:
+        return item[1]
+    return None
+
+
+def _cache_guardar(cache: dict, ticker: str, valor):
+    """Guarda o valor para o ticker, descartando a entrada mais antiga se cheio."""
+    with _CACHE_LOCK:
+        cache.pop(ticker, None)
+        if len(cache) >= _CACHE_MAX:
+            cache.pop(next(iter(cache)))
+        cache[ticker] = (time.monotonic(), valor)
+    return valor
+
+
+def _metricas_risco(fechamentos: np.ndarray) -> tuple:
+    """
+    Volatilidade anualizada, max drawdown e variação do período (em %) sobre
+    o array de fechamentos, sem as Series intermediárias do pandas.
+    """
+    retornos = fechamentos[1:] / fechamentos[:-1] - 1
+    retornos = retornos[~np.isnan(retornos)]
+    volatilidade_anual = retornos.std(ddof=1) * (252 ** 0.5) * 100  # Anualizada
+
+    # Max drawdown (fmax ignora NaN no pico acumulado, como o cummax)
+    rolling_max = np.fmax.accumulate(fechamentos)
+    max_drawdown = np.nanmin((fechamentos - rolling_max) / rolling_max) * 100
+
+    variacao_ano = ((fechamentos[-1] / fechamentos[0]) - 1) * 100
+    return volatilidade_anual, max_drawdown, variacao_ano
+
+
 class CriptoTools:
     """Ferramentas para análise técnica e de risco de criptoativos"""
 
@@ -102,6 +150,146 @@ class CriptoTools:
         }
     }
 
+    # Análises de segurança das redes avaliadas, por símbolo
+    ANALISES_SEGURANCA_REDES = {
+        "BTC": {
+            "rede": "Bitcoin",
+            "consenso": "Proof of Work",
+            "seguranca": {
+                "nivel": "🟢 Máxima",
+                "hashrate": "Maior hashrate do mundo",
+                "descentralizacao": "Alta - milhares de nodes globais",
+                "historico_hacks": "Zero hacks na rede principal",
+                "tempo_ativo": "15+ anos sem downtime"
+            },
+            "riscos": [
+                "Risco regulatório em alguns países",
+                "Consumo energético (questão ESG)",
+                "Volatilidade de preço"
+            ],
+            "auditorias": "Código aberto, revisado globalmente por 15 anos",
+            "veredicto": "Rede mais segura e testada do ecossistema cripto"
+        },
+        "ETH": {
+            "rede": "Ethereum",
+            "consenso": "Proof of Stake",
+            "seguranca": {
+                "nivel": "🟢 Alta",
+                "staking": "Milhões de ETH em stake",
+                "descentralizacao": "Alta - milhares de validadores",
+                "historico_hacks": "Rede principal segura (DAO hack foi em smart contract)",
+                "tempo_ativo": "9+ anos, transição PoS bem-sucedida"
+            },
+            "riscos": [
+                "Complexidade do ecossistema",
+                "Smart contracts podem ter bugs",
+                "Taxas altas em picos de uso",
+                "Risco regulatório (staking)"
+            ],
+            "auditorias": "Código aberto, múltiplas auditorias, bug bounties ativos",
+            "veredicto": "Infraestrutura sólida, mas requer atenção aos protocolos DeFi"
+        },
+        "SOL": {
+            "rede": "Solana",
+            "consenso": "Proof of History + Proof of Stake",
+            "seguranca": {
+                "nivel": "🟡 Média",
+                "performance": "Alta velocidade, baixas taxas",
+                "descentralizacao": "Média - hardware requirements altos",
+                "historico_hacks": "Múltiplos outages (rede parou)",
+                "tempo_ativo": "4+ anos"
+            },
+            "riscos": [
+                "Histórico de instabilidade (outages)",
+                "Centralização de validadores",
+                "Dependência de hardware específico",
+                "Menor battle-testing"
+            ],
+            "auditorias": "Código aberto, auditorias em andamento",
+            "veredicto": "Promissor mas ainda provando resiliência"
+        }
+    }
+
+    # Protocolos DeFi avaliados, por nome
+    PROTOCOLOS_AVALIADOS = {
+        "AAVE": {
+            "nome": "Aave",
+            "tipo": "Lending/Borrowing",
+            "seguranca": "🟢 Alta",
+            "tvl": "Top 5 DeFi",
+            "auditorias": "Múltiplas auditorias (OpenZeppelin, Trail of Bits)",
+            "historico": "Operando desde 2020, sem hacks significativos",
+            "riscos": ["Smart contract risk", "Riscos de liquidação", "Risco regulatório"],
+            "veredicto": "Protocolo maduro, um dos mais seguros do DeFi"
+        },
+        "UNISWAP": {
+            "nome": "Uniswap",
+            "tipo": "DEX (Exchange Descentralizada)",
+            "seguranca": "🟢 Alta",
+            "tvl": "Maior DEX por volume",
+            "auditorias": "Múltiplas auditorias",
+            "historico": "Operando desde 2018, pioneiro em AMM",
+            "riscos": ["Impermanent loss para LPs", "Front-running", "Smart contract risk"],
+            "veredicto": "DEX mais battle-tested do mercado"
+        },
+        "LIDO": {
+            "nome": "Lido",
+            "tipo": "Liquid Staking",
+            "seguranca": "🟡 Média-Alta",
+            "tvl": "Maior protocolo de liquid staking",
+            "auditorias": "Múltiplas auditorias",
+            "historico": "Operando desde 2020",
+            "riscos": ["Centralização do staking ETH", "Smart contract risk", "Slashing risk"],
+            "veredicto": "Líder do setor, mas atenção à concentração"
+        }
+    }
+
+    # Comparativo das opções de custódia
+    COMPARATIVO_CUSTODIA = {
+        "self_custody": {
+            "tipo": "Você guarda suas próprias chaves",
+            "opcoes": ["Hardware wallet (Ledger, Trezor)", "Software wallet (MetaMask, etc.)"],
+            "vantagens": [
+                "Controle total dos ativos",
+                "Sem risco de exchange quebrar",
+                "Privacidade",
+                "'Not your keys, not your coins'"
+            ],
+            "desvantagens": [
+                "Responsabilidade total (perder seed = perder tudo)",
+                "Requer conhecimento técnico",
+                "Menos conveniente para trading"
+            ],
+            "recomendado_para": "Valores acima de R$ 10.000 ou hodlers de longo prazo",
+            "seguranca": "🟢 Máxima (se feito corretamente)"
+        },
+        "exchange_custodia": {
+            "tipo": "Exchange guarda seus ativos",
+            "opcoes": ["Exchanges grandes (Binance, Coinbase, Kraken)", "Exchanges brasileiras (Mercado Bitcoin, etc.)"],
+            "vantagens": [
+                "Conveniente",
+                "Fácil para iniciantes",
+                "Suporte ao cliente",
+                "Seguro de custódia (algumas)"
+            ],
+            "desvantagens": [
+                "Risco de falência da exchange (FTX, Mt. Gox)",
+                "Hacks são possíveis",
+                "Você não controla as chaves",
+                "KYC obrigatório"
+            ],
+            "recomendado_para": "Valores menores ou traders ativos",
+            "seguranca": "🟡 Média (depende da exchange)"
+        },
+        "custodia_institucional": {
+            "tipo": "Custodiante regulado",
+            "opcoes": ["Fireblocks", "BitGo", "Fidelity Digital Assets"],
+            "recomendado_para": "Investidores institucionais ou patrimônio muito alto",
+            "seguranca": "🟢 Alta (regulado e segurado)"
+        },
+        "regra_gizmoduck": "Para valores relevantes: SEMPRE self-custody com hardware wallet. Exchanges são para comprar, não para guardar."
+    }
+
     def get_cripto_dados(self, simbolo: str) -> dict:
         """
         Obtém dados atuais de uma criptomoeda.
@@ -114,95 +302,200 @@ class CriptoTools:
         """
         try:
             ticker = f"{simbolo.upper()}-USD"
-            cripto = yf.Ticker(ticker)
-            info = cripto.info
-            hist = cripto.history(period="1y")
-
-            preco = info.get("regularMarketPrice", info.get("previousClose", 0))
-
-            # Calcular métricas
-            variacao_24h = info.get("regularMarketChangePercent", 0)
-
-            # Volatilidade e drawdown
-            volatilidade_anual = None
-            max_drawdown = None
-            variacao_ano = None
-
-            if not hist.empty and len(hist) > 30:
-                retornos = hist['Close'].pct_change().dropna()
-                volatilidade_anual = retornos.std() * (252 ** 0.5) * 100  # Anualizada
-
-                # Max drawdown
-                rolling_max = hist['Close'].cummax()
-                drawdown = (hist['Close'] - rolling_max) / rolling_max
-                max_drawdown = drawdown.min() * 100
-
-                # Variação no ano
-                variacao_ano = ((hist['Close'].iloc[-1] / hist['Close'].iloc[0]) - 1) * 100
-
-            # Classificação de risco
-            classificacao = self._classificar_ativo(simbolo.upper())
-
-            return {
-                "simbolo": simbolo.upper(),
-                "nome": info.get("name", simbolo),
-                "preco_usd": round(preco, 2) if preco else "N/A",
-                "variacao_24h": f"{variacao_24h:.2f}%" if variacao_24h else "N/A",
-                "variacao_12_meses": f"{variacao_ano:.1f}%" if variacao_ano else "N/A",
-                "market_cap": info.get("marketCap", "N/A"),
-                "volume_24h": info.get("volume24Hr", info.get("volume", "N/A")),
-                "metricas_risco": {
-                    "volatilidade_anual": f"{volatilidade_anual:.1f}%" if volatilidade_anual else "N/A",
-                    "max_drawdown_12m": f"{max_drawdown:.1f}%" if max_drawdown else "N/A"
-                },
-                "classificacao": classificacao,
-                "aviso": "Criptoativos são de alto risco. Nunca invista mais do que pode perder."
-            }
+            info = _cache_obter(_INFO_CACHE, ticker, _INFO_TTL)
+            hist = _cache_obter(_HIST_CACHE, ticker, _HIST_TTL)
+            if info is None or hist is None:
+                cripto = yf.Ticker(ticker)
+                if info is None:
+                    info = _cache_guardar(_INFO_CACHE, ticker, cripto.info)
+                if hist is None:
+                    hist = _cache_guardar(_HIST_CACHE, ticker, cripto.history(period="1y"))
+
+            return self._montar_dados(simbolo, info, hist)
         except Exception as e:
             return {"erro": str(e), "simbolo": simbolo}
 
-    def _classificar_ativo(self, simbolo: str) -> dict:
-        """Classifica um ativo por categoria de risco."""
-        # Verificar infraestrutura base
-        if simbolo in self.CLASSIFICACAO_ATIVOS["infraestrutura_base"]:
-            info = self.CLASSIFICACAO_ATIVOS["infraestrutura_base"][simbolo]
-            return {
-                "categoria": "🟢 Infraestrutura Base",
-                "risco": "VERDE",
-                "descricao": info["descricao"],
-                "caso_uso": info["caso_uso"],
-                "maturidade": info["maturidade"]
-            }
+    def get_cripto_dados_lote(self, simbolos: List[str]) -> List[dict]:
+        """
+        Obtém dados atuais de várias criptomoedas de uma vez.
 
-        # Verificar infraestrutura em expansão
-        if simbolo in self.CLASSIFICACAO_ATIVOS["infraestrutura_expansao"]:
-            info = self.CLASSIFICACAO_ATIVOS["infraestrutura_expansao"][simbolo]
-            return {
-                "categoria": "🟡 Infraestrutura em Expansão",
-                "risco": "AMARELO",
-                "descricao": info["descricao"],
-                "caso_uso": info["caso_uso"],
-                "maturidade": info["maturidade"]
-            }
+        O histórico de 1 ano de todos os símbolos vem de um único yf.download;
+        o info (que o Yahoo não entrega em lote) é buscado em paralelo. O que
+        ainda está no cache de consultas recentes não é buscado de novo.
 
-        # Verificar se é meme coin conhecida
-        meme_coins = ["DOGE", "SHIB", "PEPE", "FLOKI", "BONK", "WIF", "BRETT"]
-        if simbolo in meme_coins:
-            return {
-                "categoria": "☠️ Inaceitável",
-                "risco": "CAVEIRA",
-                "descricao": "Meme coin sem fundamento técnico",
-                "recomendacao": "ZERO exposição - não é investimento, é aposta"
-            }
+        Args:
+            simbolos: Lista de símbolos (BTC, ETH, SOL, etc.)
+
+        Returns:
+            Lista com os dados e métricas de cada cripto, na ordem pedida
+        """
+        if not simbolos:
+            return []
+        tickers = [f"{s.upper()}-USD" for s in simbolos]
+        infos = {t: _cache_obter(_INFO_CACHE, t, _INFO_TTL) for t in tickers}
+        historicos = {t: _cache_obter(_HIST_CACHE, t, _HIST_TTL) for t in tickers}
+        try:
+            # Só vai ao Yahoo o que não está no cache
+            faltam_hist = [t for t, hist in historicos.items() if hist is None]
+            if faltam_hist:
+                dados = yf.download(
+                    tickers=" ".join(faltam_hist), period="1y", group_by="ticker",
+                    threads=True, progress=False
+                )
+                for t in faltam_hist:
+                    # Com um único ticker, versões antigas do yfinance não agrupam as colunas
+                    hist = dados[t].dropna(how="all") if dados.columns.nlevels > 1 else dados
+                    historicos[t] = _cache_guardar(_HIST_CACHE, t, hist)
+
+            faltam_info = [t for t, info in infos.items() if info is None]
+            if faltam_info:
+                cotacoes = yf.Tickers(" ".join(faltam_info))
+                with ThreadPoolExecutor(max_workers=min(8, len(faltam_info))) as executor:
+                    buscados = executor.map(lambda t: self._obter_info(cotacoes.tickers[t]), faltam_info)
+                    for t, info in zip(faltam_info, buscados):
+                        infos[t] = info if isinstance(info, Exception) else _cache_guardar(_INFO_CACHE, t, info)
+        except Exception as e:
+            return [{"erro": str(e), "simbolo": s} for s in simbolos]
+
+        resultados = []
+        for simbolo, ticker in zip(simbolos, tickers):
+            try:
+                info = infos[ticker]
+                if isinstance(info, Exception):
+                    raise info
+                resultados.append(self._montar_dados(simbolo, info, historicos[ticker]))
+            except Exception as e:
+                resultados.append({"erro": str(e), "simbolo": simbolo})
+        return resultados
+
+    @staticmethod
+    def _obter_info(cripto):
+        """Busca o info de um Ticker, devolvendo a exceção em vez de propagá-la."""
+        try:
+            return cripto.info
+        except Exception as e:
+            return e
+
+    def _montar_dados(self, simbolo: str, info: dict, hist) -> dict:
+        """Monta a resposta de get_cripto_dados a partir do info e do histórico."""
+        preco = info.get("regularMarketPrice", info.get("previousClose", 0))
+
+        # Calcular métricas
+        variacao_24h = info.get("regularMarketChangePercent", 0)
+
+        # Volatilidade e drawdown
+        volatilidade_anual = None
+        max_drawdown = None
+        variacao_ano = None
+
+        if not hist.empty and len(hist) > 30:
+            volatilidade_anual, max_drawdown, variacao_ano = _metricas_risco(
+                hist['Close'].to_numpy(dtype=np.float64)
+            )
+
+        # Classificação de risco
+        classificacao = self._classificar_ativo(simbolo.upper())
 
-        # Não classificado = experimental por padrão
         return {
-            "categoria": "🔴 Experimental / Não Classificado",
-            "risco": "VERMELHO",
-            "descricao": "Ativo não avaliado ou de alto risco",
-            "recomendacao": "Requer análise aprofundada antes de qualquer exposição"
+            "simbolo": simbolo.upper(),
+            "nome": info.get("name", simbolo),
+            "preco_usd": round(preco, 2) if preco else "N/A",
+            "variacao_24h": f"{variacao_24h:.2f}%" if variacao_24h else "N/A",
+            "variacao_12_meses": f"{variacao_ano:.1f}%" if variacao_ano else "N/A",
+            "market_cap": info.get("marketCap", "N/A"),
+            "volume_24h": info.get("volume24Hr", info.get("volume", "N/A")),
+            "metricas_risco": {
+                "volatilidade_anual": f"{volatilidade_anual:.1f}%" if volatilidade_anual else "N/A",
+                "max_drawdown_12m": f"{max_drawdown:.1f}%" if max_drawdown else "N/A"
+            },
+            "classificacao": classificacao,
+            "aviso": "Criptoativos são de alto risco. Nunca invista mais do que pode perder."
+        }
+
+    # Meme coins conhecidas (conjunto para teste de pertinência O(1))
+    MEME_COINS = frozenset({"DOGE", "SHIB", "PEPE", "FLOKI", "BONK", "WIF", "BRETT"})
+
+    # Resultados de _classificar_ativo pré-montados por _preparar_indices()
+    _INDICE_ATIVOS = {}
+    # Resposta de listar_classificacao_ativos, também montada por _preparar_indices()
+    _LISTA_CLASSIFICACAO = {}
+
+    _CLASSIFICACAO_MEME = {
+        "categoria": "☠️ Inaceitável",
+        "risco": "CAVEIRA",
+        "descricao": "Meme coin sem fundamento técnico",
+        "recomendacao": "ZERO exposição - não é investimento, é aposta"
+    }
+
+    _CLASSIFICACAO_EXPERIMENTAL = {
+        "categoria": "🔴 Experimental / Não Classificado",
+        "risco": "VERMELHO",
+        "descricao": "Ativo não avaliado ou de alto risco",
+        "recomendacao": "Requer análise aprofundada antes de qualquer exposição"
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        """Subclasses podem redefinir CLASSIFICACAO_ATIVOS; o índice é refeito para elas"""
+        super().__init_subclass__(**kwargs)
+        cls._preparar_indices()
+
+    @classmethod
+    def _preparar_indices(cls):
+        """
+        Monta, uma vez por classe, o índice símbolo -> classificação a partir de
+        CLASSIFICACAO_ATIVOS, para que _classificar_ativo faça um único lookup,
+        e a visão completa devolvida por listar_classificacao_ativos.
+        """
+        grupos = (
+            ("infraestrutura_base", "🟢 Infraestrutura Base", "VERDE"),
+            ("infraestrutura_expansao", "🟡 Infraestrutura em Expansão", "AMARELO"),
+        )
+        indice = {}
+        for grupo, categoria, risco in grupos:
+            for simbolo, info in cls.CLASSIFICACAO_ATIVOS[grupo].items():
+                # setdefault: como na cadeia de ifs, o primeiro grupo vence
+                indice.setdefault(simbolo, {
+                    "categoria": categoria,
+                    "risco": risco,
+                    "descricao": info["descricao"],
+                    "caso_uso": info["caso_uso"],
+                    "maturidade": info["maturidade"]
+                })
+        for simbolo in cls.MEME_COINS:
+            indice.setdefault(simbolo, cls._CLASSIFICACAO_MEME)
+        cls._INDICE_ATIVOS = indice
+
+        # Visão completa devolvida por listar_classificacao_ativos
+        cls._LISTA_CLASSIFICACAO = {
+            "🟢 Infraestrutura Base": {
+                "descricao": "Ativos maduros, battle-tested, casos de uso comprovados",
+                "exposicao_recomendada": "Base da carteira cripto (70%+)",
+                "ativos": cls.CLASSIFICACAO_ATIVOS["infraestrutura_base"]
+            },
+            "🟡 Infraestrutura em Expansão": {
+                "descricao": "Projetos sólidos em desenvolvimento, maior risco que a base",
+                "exposicao_recomendada": "Complemento da carteira (até 25%)",
+                "ativos": cls.CLASSIFICACAO_ATIVOS["infraestrutura_expansao"]
+            },
+            "🔴 Experimental": {
+                "descricao": "Projetos novos, não consolidados, alto risco",
+                "exposicao_recomendada": "Máximo 5% da carteira cripto",
+                "criterios": "Requer análise profunda antes de qualquer exposição"
+            },
+            "☠️ Inaceitável": {
+                "descricao": "Meme coins, projetos sem fundamento, promessas irreais",
+                "exposicao_recomendada": "ZERO - Não é investimento",
+                "exemplos": cls.CLASSIFICACAO_ATIVOS["inaceitavel"]["exemplos"]
+            },
+            "filosofia_gizmoduck": "Cripto é infraestrutura financeira, não cassino. Segurança > Hype."
         }
 
+    def _classificar_ativo(self, simbolo: str) -> dict:
+        """Classifica um ativo por categoria de risco."""
+        # Não classificado = experimental por padrão
+        # (resultado pré-montado e compartilhado, como as demais respostas constantes)
+        return self._INDICE_ATIVOS.get(simbolo, self._CLASSIFICACAO_EXPERIMENTAL)
+
     def analisar_seguranca_rede(self, simbolo: str) -> dict:
         """
         Analisa aspectos de segurança de uma rede blockchain.
@@ -213,68 +506,9 @@ class CriptoTools:
         Returns:
             Análise de segurança
         """
-        analises = {
-            "BTC": {
-                "rede": "Bitcoin",
-                "consenso": "Proof of Work",
-                "seguranca": {
-                    "nivel": "🟢 Máxima",
-                    "hashrate": "Maior hashrate do mundo",
-                    "descentralizacao": "Alta - milhares de nodes globais",
-                    "historico_hacks": "Zero hacks na rede principal",
-                    "tempo_ativo": "15+ anos sem downtime"
-                },
-                "riscos": [
-                    "Risco regulatório em alguns países",
-                    "Consumo energético (questão ESG)",
-                    "Volatilidade de preço"
-                ],
-                "auditorias": "Código aberto, revisado globalmente por 15 anos",
-                "veredicto": "Rede mais segura e testada do ecossistema cripto"
-            },
-            "ETH": {
-                "rede": "Ethereum",
-                "consenso": "Proof of Stake",
-                "seguranca": {
-                    "nivel": "🟢 Alta",
-                    "staking": "Milhões de ETH em stake",
-                    "descentralizacao": "Alta - milhares de validadores",
-                    "historico_hacks": "Rede principal segura (DAO hack foi em smart contract)",
-                    "tempo_ativo": "9+ anos, transição PoS bem-sucedida"
-                },
-                "riscos": [
-                    "Complexidade do ecossistema",
-                    "Smart contracts podem ter bugs",
-                    "Taxas altas em picos de uso",
-                    "Risco regulatório (staking)"
-                ],
-                "auditorias": "Código aberto, múltiplas auditorias, bug bounties ativos",
-                "veredicto": "Infraestrutura sólida, mas requer atenção aos protocolos DeFi"
-            },
-            "SOL": {
-                "rede": "Solana",
-                "consenso": "Proof of History + Proof of Stake",
-                "seguranca": {
-                    "nivel": "🟡 Média",
-                    "performance": "Alta velocidade, baixas taxas",
-                    "descentralizacao": "Média - hardware requirements altos",
-                    "historico_hacks": "Múltiplos outages (rede parou)",
-                    "tempo_ativo": "4+ anos"
-                },
-                "riscos": [
-                    "Histórico de instabilidade (outages)",
-                    "Centralização de validadores",
-                    "Dependência de hardware específico",
-                    "Menor battle-testing"
-                ],
-                "auditorias": "Código aberto, auditorias em andamento",
-                "veredicto": "Promissor mas ainda provando resiliência"
-            }
-        }
-
         simbolo_upper = simbolo.upper()
-        if simbolo_upper in analises:
-            return analises[simbolo_upper]
+        if simbolo_upper in self.ANALISES_SEGURANCA_REDES:
+            return self.ANALISES_SEGURANCA_REDES[simbolo_upper]
 
         return {
             "rede": simbolo_upper,
@@ -356,42 +590,9 @@ class CriptoTools:
         Returns:
             Avaliação de risco
         """
-        protocolos_avaliados = {
-            "AAVE": {
-                "nome": "Aave",
-                "tipo": "Lending/Borrowing",
-                "seguranca": "🟢 Alta",
-                "tvl": "Top 5 DeFi",
-                "auditorias": "Múltiplas auditorias (OpenZeppelin, Trail of Bits)",
-                "historico": "Operando desde 2020, sem hacks significativos",
-                "riscos": ["Smart contract risk", "Riscos de liquidação", "Risco regulatório"],
-                "veredicto": "Protocolo maduro, um dos mais seguros do DeFi"
-            },
-            "UNISWAP": {
-                "nome": "Uniswap",
-                "tipo": "DEX (Exchange Descentralizada)",
-                "seguranca": "🟢 Alta",
-                "tvl": "Maior DEX por volume",
-                "auditorias": "Múltiplas auditorias",
-                "historico": "Operando desde 2018, pioneiro em AMM",
-                "riscos": ["Impermanent loss para LPs", "Front-running", "Smart contract risk"],
-                "veredicto": "DEX mais battle-tested do mercado"
-            },
-            "LIDO": {
-                "nome": "Lido",
-                "tipo": "Liquid Staking",
-                "seguranca": "🟡 Média-Alta",
-                "tvl": "Maior protocolo de liquid staking",
-                "auditorias": "Múltiplas auditorias",
-                "historico": "Operando desde 2020",
-                "riscos": ["Centralização do staking ETH", "Smart contract risk", "Slashing risk"],
-                "veredicto": "Líder do setor, mas atenção à concentração"
-            }
-        }
-
         protocolo_upper = protocolo.upper()
-        if protocolo_upper in protocolos_avaliados:
-            return protocolos_avaliados[protocolo_upper]
+        if protocolo_upper in self.PROTOCOLOS_AVALIADOS:
+            return self.PROTOCOLOS_AVALIADOS[protocolo_upper]
 
         return {
             "protocolo": protocolo,
@@ -415,50 +616,7 @@ class CriptoTools:
         Returns:
             Comparativo de custódia
         """
-        return {
-            "self_custody": {
-                "tipo": "Você guarda suas próprias chaves",
-                "opcoes": ["Hardware wallet (Ledger, Trezor)", "Software wallet (MetaMask, etc.)"],
-                "vantagens": [
-                    "Controle total dos ativos",
-                    "Sem risco de exchange quebrar",
-                    "Privacidade",
-                    "'Not your keys, not your coins'"
-                ],
-                "desvantagens": [
-                    "Responsabilidade total (perder seed = perder tudo)",
-                    "Requer conhecimento técnico",
-                    "Menos conveniente para trading"
-                ],
-                "recomendado_para": "Valores acima de R$ 10.000 ou hodlers de longo prazo",
-                "seguranca": "🟢 Máxima (se feito corretamente)"
-            },
-            "exchange_custodia": {
-                "tipo": "Exchange guarda seus ativos",
-                "opcoes": ["Exchanges grandes (Binance, Coinbase, Kraken)", "Exchanges brasileiras (Mercado Bitcoin, etc.)"],
-                "vantagens": [
-                    "Conveniente",
-                    "Fácil para iniciantes",
-                    "Suporte ao cliente",
-                    "Seguro de custódia (algumas)"
-                ],
-                "desvantagens": [
-                    "Risco de falência da exchange (FTX, Mt. Gox)",
-                    "Hacks são possíveis",
-                    "Você não controla as chaves",
-                    "KYC obrigatório"
-                ],
-                "recomendado_para": "Valores menores ou traders ativos",
-                "seguranca": "🟡 Média (depende da exchange)"
-            },
-            "custodia_institucional": {
-                "tipo": "Custodiante regulado",
-                "opcoes": ["Fireblocks", "BitGo", "Fidelity Digital Assets"],
-                "recomendado_para": "Investidores institucionais ou patrimônio muito alto",
-                "seguranca": "🟢 Alta (regulado e segurado)"
-            },
-            "regra_gizmoduck": "Para valores relevantes: SEMPRE self-custody com hardware wallet. Exchanges são para comprar, não para guardar."
-        }
+        return self.COMPARATIVO_CUSTODIA
 
     def listar_classificacao_ativos(self) -> dict:
         """
@@ -467,26 +625,7 @@ class CriptoTools:
         Returns:
             Classificação de todos os ativos
         """
-        return {
-            "🟢 Infraestrutura Base": {
-                "descricao": "Ativos maduros, battle-tested, casos de uso comprovados",
-                "exposicao_recomendada": "Base da carteira cripto (70%+)",
-                "ativos": self.CLASSIFICACAO_ATIVOS["infraestrutura_base"]
-            },
-            "🟡 Infraestrutura em Expansão": {
-                "descricao": "Projetos sólidos em desenvolvimento, maior risco que a base",
-                "exposicao_recomendada": "Complemento da carteira (até 25%)",
-                "ativos": self.CLASSIFICACAO_ATIVOS["infraestrutura_expansao"]
-            },
-            "🔴 Experimental": {
-                "descricao": "Projetos novos, não consolidados, alto risco",
-                "exposicao_recomendada": "Máximo 5% da carteira cripto",
-                "criterios": "Requer análise profunda antes de qualquer exposição"
-            },
-            "☠️ Inaceitável": {
-                "descricao": "Meme coins, projetos sem fundamento, promessas irreais",
-                "exposicao_recomendada": "ZERO - Não é investimento",
-                "exemplos": self.CLASSIFICACAO_ATIVOS["inaceitavel"]["exemplos"]
-            },
-            "filosofia_gizmoduck": "Cripto é infraestrutura financeira, não cassino. Segurança > Hype."
-        }
+        return self._LISTA_CLASSIFICACAO
+
+
+CriptoTools._preparar_indices()
@@ -1,9 +1,14 @@
 import os
 import io
+import threading
+from functools import lru_cache
 import pdfplumber
 import datetime
+import google_auth_httplib2
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest, MediaIoBaseDownload, build_http
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -14,6 +19,11 @@ import re
 # Carrega configurações
 load_dotenv()
 
+# Tamanho de cada trecho no download dos PDFs (notas comuns vêm numa requisição só)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Limite opcional de páginas lidas por nota (0 ou ausente = todas)
+MAX_PAGES = int(os.getenv("RICO_MAX_PAGES") or 0) or None
+
 # Escopos necessários
 SCOPES = [
     'https://www.googleapis.com/auth/gmail.readonly',    # Para ler emails
@@ -23,8 +33,40 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive'
 ]
 
+# Regexes compiladas uma vez por processo, não a cada PDF
+# Padrão otimizado para a Rico, aplicado ao texto inteiro com finditer:
+# MULTILINE ancora cada negociação no início de uma linha e [^\S\n]
+# (espaço que não é quebra de linha) impede que um trade atravesse linhas
+_TRADE_RE = re.compile(
+    r'^[^\S\n]*'                            # Recuo da linha (o antigo strip)
+    r'(?P<num_neg>\d+-[A-Z]+)[^\S\n]+'      # Número da negociação (1-BOVESPA)
+    r'(?P<cv>[CV])[^\S\n]+'                  # C/V (Compra/Venda)
+    r'(?P<mercado>[A-ZÇÃÉÓÚÍ]+)[^\S\n]+'     # Tipo de mercado (FRACIONARIO/VISTA/OPÇÃO)
+    r'(?P<ativo>(?:[A-Z0-9]|[^\S\n])+?)[^\S\n]+'  # Ativo (BRASIL ON NM)
+    r'(?P<qtd>\d+)[^\S\n]+'                  # Quantidade
+    r'(?P<preco>[\d\.,]+)[^\S\n]+'           # Preço (20,70)
+    r'(?P<valor>[\d\.,]+)[^\S\n]+'           # Valor total (82,80)
+    r'(?P<dc>[CD])'                          # D/C (Débito/Crédito)
+    r'(?![^\n]*Q Negociação)',               # Linha de cabeçalho não é negociação
+    re.MULTILINE
+)
+# Data do pregão
+_DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
+# Caracteres especiais no fim do nome do ativo
+_CLEAN_ASSET_RE = re.compile(r'[@#*]\s*$')
+# Número no formato brasileiro (1.234,56) para float, numa única passada
+_NUM_TABLE = str.maketrans({'.': None, ',': '.'})
+
+# Serviços (drive, sheets) já autenticados, reaproveitados nas chamadas seguintes.
+# As credenciais dentro deles se renovam sozinhas quando expiram
+_services_cache = None
+
 def get_services():
     """Autentica e retorna os serviços Drive e Sheets"""
+    global _services_cache
+    if _services_cache is not None:
+        return _services_cache
+
     creds = None
     if os.path.exists('token.json'):
         creds = Credentials.from_authorized_user_file('token.json', SCOPES)
@@ -42,32 +84,58 @@ def get_services():
         with open('token.json', 'w') as token:
             token.write(creds.to_json())
     
-    drive = build('drive', 'v3', credentials=creds)
-    sheets = build('sheets', 'v4', credentials=creds)
-    return drive, sheets
+    # O httplib2 não é thread-safe: cada thread faz suas requisições numa
+    # conexão autenticada própria (padrão documentado do googleapiclient)
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(_thread_http(creds), *args, **kwargs)
+
+    drive = build('drive', 'v3', credentials=creds, requestBuilder=request_builder,
+                  cache_discovery=False)
+    sheets = build('sheets', 'v4', credentials=creds, requestBuilder=request_builder,
+                   cache_discovery=False)
+    _services_cache = drive, sheets
+    return _services_cache
 
-def extract_text_from_pdf(file_content: bytes, password: Optional[str] = None) -> Optional[str]:
+_thread_local = threading.local()
+
+def _thread_http(creds):
+    """Conexão autenticada da thread atual, criada na primeira requisição dela"""
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = _thread_local.http = google_auth_httplib2.AuthorizedHttp(creds, http=build_http())
+    return http
+
+def extract_text_from_pdf(file_content, password: Optional[str] = None,
+                          max_pages: Optional[int] = None) -> Optional[str]:
     """
     Extrai texto de PDF usando pdfplumber, com suporte a senha
     
     Args:
-        file_content: Conteúdo binário do PDF
+        file_content: Conteúdo binário do PDF (bytes ou arquivo binário já aberto)
         password: Senha opcional para PDFs criptografados
+        max_pages: Lê só as primeiras N páginas (None = todas)
     
     Returns:
         Texto extraído ou None em caso de falha
     """
     try:
-        # Cria um objeto de arquivo em memória
-        pdf_file = io.BytesIO(file_content)
+        # Cria um objeto de arquivo em memória (streams são usados diretamente)
+        if isinstance(file_content, (bytes, bytearray)):
+            pdf_file = io.BytesIO(file_content)
+        else:
+            pdf_file = file_content
+            pdf_file.seek(0)
         
         # Configurações para PDFs protegidos
         open_params = {}
         if password:
             open_params['password'] = password
+        if max_pages:
+            open_params['pages'] = list(range(1, max_pages + 1))
         
         with pdfplumber.open(pdf_file, **open_params) as pdf:
-            text = ""
+            # Páginas acumuladas numa lista e unidas no fim (sem += de string)
+            chunks = []
             for page in pdf.pages:
                 try:
                     # Extrai texto mantendo layout básico
@@ -78,12 +146,13 @@ def extract_text_from_pdf(file_content: bytes, password: Optional[str] = None) -
                         use_text_flow=False
                     )
                     if page_text:
-                        text += page_text + "\n"
+                        chunks.append(page_text)
                 
                 except Exception as page_error:
                     print(f"⚠️ Erro na página {page.page_number}: {str(page_error)}")
                     continue
             
+            text = "\n".join(chunks)
             return text.strip().replace('@','') if text else None
     
     except pdfplumber.PasswordError:
@@ -112,45 +181,32 @@ def extract_data_from_text(text: str) -> Dict:
     """
     trades = []
     
-    # Padrão otimizado para a Rico
-    trade_pattern = re.compile(
-        r'^(?P<num_neg>\d+-[A-Z]+)\s+'  # Número da negociação (1-BOVESPA)
-        r'(?P<cv>[CV])\s+'              # C/V (Compra/Venda)
-        r'(?P<mercado>[A-ZÇÃÉÓÚÍ]+)\s+' # Tipo de mercado (FRACIONARIO/VISTA/OPÇÃO)
-        r'(?P<ativo>[A-Z0-9\s]+?)\s+'   # Ativo (BRASIL ON NM)
-        r'(?P<qtd>\d+)\s+'              # Quantidade
-        r'(?P<preco>[\d\.,]+)\s+'       # Preço (20,70)
-        r'(?P<valor>[\d\.,]+)\s+'       # Valor total (82,80)
-        r'(?P<dc>[CD])'                 # D/C (Débito/Crédito)
-    )
-    
     # Extrai data do pregão
-    date_match = re.search(r'\d{2}/\d{2}/\d{4}', text)
+    date_match = _DATE_RE.search(text)
     trade_date = date_match.group() if date_match else None
     
-    # Processamento linha a linha
-    for line in text.split('\n'):
-        line = line.strip()
-        if not line or 'Q Negociação' in line:  # Pula cabeçalhos
+    # Uma única varredura do texto; só as linhas com negociação viram match
+    # (cabeçalhos já são descartados pela própria regex)
+    for match in _TRADE_RE.finditer(text):
+        num_neg, cv, mercado, ativo, qtd, preco, valor, dc = match.groups()
+        try:
+            trades.append({
+                'data': trade_date,
+                'num_negociacao': num_neg,
+                'operacao': 'Compra' if cv == 'C' else 'Venda',
+                'mercado': mercado,
+                'ativo': clean_asset_name(ativo),
+                'quantidade': int(qtd),
+                'preco': float(preco.translate(_NUM_TABLE)),
+                'valor': float(valor.translate(_NUM_TABLE)),
+                'natureza': dc
+            })
+        except (ValueError, AttributeError) as e:
+            inicio = text.rfind('\n', 0, match.start()) + 1
+            fim = text.find('\n', match.end())
+            line = text[inicio:fim if fim != -1 else len(text)].strip()
+            print(f"⚠️ Erro ao processar linha: {line}\nErro: {e}")
             continue
-            
-        match = trade_pattern.search(line)
-        if match:
-            try:
-                trades.append({
-                    'data': trade_date,
-                    'num_negociacao': match.group('num_neg'),
-                    'operacao': 'Compra' if match.group('cv') == 'C' else 'Venda',
-                    'mercado': match.group('mercado'),
-                    'ativo': clean_asset_name(match.group('ativo')),
-                    'quantidade': int(match.group('qtd')),
-                    'preco': float(match.group('preco').replace('.', '').replace(',', '.')),
-                    'valor': float(match.group('valor').replace('.', '').replace(',', '.')),
-                    'natureza': match.group('dc')
-                })
-            except (ValueError, AttributeError) as e:
-                print(f"⚠️ Erro ao processar linha: {line}\nErro: {e}")
-                continue
     
     # Cálculo do resumo
     total = sum(trade['valor'] for trade in trades)
@@ -160,78 +216,77 @@ def extract_data_from_text(text: str) -> Dict:
     }
 
 # Funções auxiliares
+@lru_cache(maxsize=1024)
 def clean_asset_name(asset: str) -> str:
     """Remove caracteres especiais e normaliza nome do ativo"""
-    return re.sub(r'[@#*]\s*$', '', asset).strip()
+    return _CLEAN_ASSET_RE.sub('', asset).strip()
 
 
 ##################################################################################
 
-def update_sheet(sheets_service, data, file_name=None):
-    """Atualiza a aba 'Negociações' aceitando lista ou dicionário"""
-    try:
-        # Converte lista para o formato dicionário se necessário
-        if isinstance(data, list):
-            data = {
-                '_id': file_name.split('-')[1] if file_name else '',
-                'trades': [{
-                    'data': data[0],
-                    'num_negociacao': data[1],
-                    'operacao': data[2],
-                    'mercado': data[3],
-                    'ativo': data[4],
-                    'quantidade': data[5],
-                    'preco': data[6],
-                    'valor': data[7],
-                    'natureza': data[8]
-                }]
-            }
-        
-        # Extração segura dos dados
-        trade_data = data['trades'][0] if isinstance(data.get('trades'), list) else {}
-        
-        # Prepara a linha para o Google Sheets
-        row_data = [
-            
-            trade_data.get('data', ''),                               # Coluna A: Data
-            trade_data.get('ativo', ''),                              # Coluna B: Ativo
-            trade_data.get('operacao', ''),                           # Coluna C: Operação
-            trade_data.get('quantidade', ''),                         # Coluna D: Quantidade
-            f"{trade_data.get('preco', 0.0):.2f}".replace('.', ','),  # Coluna E: Preço Unitário
-            f"{trade_data.get('valor', 0.0):.2f}".replace('.', ','),  # Coluna F: Valor Total
-        ]
+def build_sheet_row(data, file_name=None):
+    """Monta a linha da aba 'Negociações' aceitando lista ou dicionário"""
+    # Converte lista para o formato dicionário se necessário
+    if isinstance(data, list):
+        data = {
+            '_id': file_name.split('-')[1] if file_name else '',
+            'trades': [{
+                'data': data[0],
+                'num_negociacao': data[1],
+                'operacao': data[2],
+                'mercado': data[3],
+                'ativo': data[4],
+                'quantidade': data[5],
+                'preco': data[6],
+                'valor': data[7],
+                'natureza': data[8]
+            }]
+        }
+    
+    # Extração segura dos dados
+    trade_data = data['trades'][0] if isinstance(data.get('trades'), list) else {}
+    
+    # Prepara a linha para o Google Sheets
+    return [
         
+        trade_data.get('data', ''),                               # Coluna A: Data
+        trade_data.get('ativo', ''),                              # Coluna B: Ativo
+        trade_data.get('operacao', ''),                           # Coluna C: Operação
+        trade_data.get('quantidade', ''),                         # Coluna D: Quantidade
+        f"{trade_data.get('preco', 0.0):.2f}".replace('.', ','),  # Coluna E: Preço Unitário
+        f"{trade_data.get('valor', 0.0):.2f}".replace('.', ','),  # Coluna F: Valor Total
+    ]
+
+def append_rows(sheets_service, rows):
+    """Acrescenta as linhas na aba 'Negociações' em uma única chamada"""
+    try:
         # Configuração do request
         sheet_name = "Negociações"
         body = {
-            "values": [row_data],  # Lista de linhas
+            "values": rows,  # Lista de linhas
             "majorDimension": "ROWS"
         }
         
-        # Encontra a próxima linha vazia
-        range_name = f"{sheet_name}!A:A"
-        result = sheets_service.spreadsheets().values().get(
+        # O append encontra a próxima linha vazia no servidor (sem um get antes)
+        result = sheets_service.spreadsheets().values().append(
             spreadsheetId=os.getenv('SHEETS_ID'),
-            range=range_name
-        ).execute()
-        next_row = len(result.get('values', [])) + 1
-        
-        # Envia os dados
-        sheets_service.spreadsheets().values().append(
-            spreadsheetId=os.getenv('SHEETS_ID'),
-            range=f"{sheet_name}!A{next_row}",
+            range=f"{sheet_name}!A:A",
             valueInputOption="USER_ENTERED",
             insertDataOption="INSERT_ROWS",
             body=body
         ).execute()
         
-        print(f"✅ Dados inseridos na linha {next_row}:")
+        print(f"✅ {len(rows)} linha(s) inserida(s) em {result.get('updates', {}).get('updatedRange', sheet_name)}")
         
         
     except Exception as e:
         print(f"❌ Erro ao atualizar planilha: {str(e)}")
         raise
 
+def update_sheet(sheets_service, data, file_name=None):
+    """Atualiza a aba 'Negociações' aceitando lista ou dicionário"""
+    append_rows(sheets_service, [build_sheet_row(data, file_name)])
+
 def mark_as_processed(drive_service, file_id, original_name, status):
     """Marca o arquivo como processado com status detalhado"""
     try:
@@ -245,6 +300,32 @@ def mark_as_processed(drive_service, file_id, original_name, status):
     except Exception as e:
         print(f"⚠️ Falha ao renomear arquivo: {str(e)}")
 
+def mark_files_as_processed(drive_service, marks):
+    """Marca vários arquivos como processados em requisições em lote (até 100 por lote)"""
+    def callback(request_id, response, exception):
+        _, original_name, status = marks[int(request_id)]
+        if exception is not None:
+            print(f"⚠️ Falha ao renomear arquivo {original_name}: {str(exception)}")
+        else:
+            print(f"📌 Marcado como {status}: [PROCESSADO_{status}] {original_name}")
+    
+    for inicio in range(0, len(marks), 100):
+        batch = drive_service.new_batch_http_request(callback=callback)
+        for i in range(inicio, min(inicio + 100, len(marks))):
+            file_id, original_name, status = marks[i]
+            batch.add(
+                drive_service.files().update(
+                    fileId=file_id,
+                    body={'name': f"[PROCESSADO_{status}] {original_name}"},
+                    fields='name'
+                ),
+                request_id=str(i)
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            print(f"⚠️ Falha ao renomear arquivos: {str(e)}")
+
 def process_drive_files(drive_service, sheets_service):
     """Processa arquivos PDF não lidos e envia trades para a planilha"""
     query = f"""
@@ -268,65 +349,83 @@ def process_drive_files(drive_service, sheets_service):
     
     print(f"\n🔍 Encontrados {len(files)} arquivos para processar...")
     
-    for file in files:
-        print(f"\n📄 Iniciando processamento: {file['name']}")
-        try:
-            # 1. Download do arquivo
-            request = drive_service.files().get_media(fileId=file['id'])
-            file_content = request.execute()
-            
-            # 2. Extração de texto com tratamento de erro
-            text = extract_text_from_pdf(
-                file_content,
-                password=os.getenv("PDF_PASSWORD")
-            )
-            if not text:
-                print("⏭ Arquivo não legível ou vazio - pulando")
-                continue
-            
-            # 3. Processamento dos dados
-            extracted_data = extract_data_from_text(text)
-            print(extracted_data)
-            #
-            if not extracted_data or not extracted_data.get('trades'):
-                print("ℹ️ Nenhuma negociação encontrada no arquivo")
-                mark_as_processed(drive_service, file['id'], file['name'], "SEM_NEGOCIACOES")
+    pending_rows = []
+    pending_files = []
+    pending_marks = []  # (file_id, nome original, status), renomeados em lote no fim
+    
+    # Downloads e extração em paralelo; o restante segue na ordem dos arquivos
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+        futuros = [executor.submit(_download_and_extract, drive_service, file) for file in files]
+
+        for file, futuro in zip(files, futuros):
+            print(f"\n📄 Iniciando processamento: {file['name']}")
+            try:
+                # 1-2. Download e extração de texto (já feitos no pool)
+                text = futuro.result()
+                if not text:
+                    print("⏭ Arquivo não legível ou vazio - pulando")
+                    continue
+                
+                # 3. Processamento dos dados
+                extracted_data = extract_data_from_text(text)
+                print(extracted_data)
+                #
+                if not extracted_data or not extracted_data.get('trades'):
+                    print("ℹ️ Nenhuma negociação encontrada no arquivo")
+                    pending_marks.append((file['id'], file['name'], "SEM_NEGOCIACOES"))
+                    continue
+                
+                # 4. Preparação dos dados para a planilha
+                sheet_data = prepare_sheet_data(extracted_data)
+                print(sheet_data)
+                # Uma linha por negociação, enviadas junto com as dos demais arquivos
+                pending_rows.extend(
+                    build_sheet_row(trade_row, file_name=file['name'])
+                    for trade_row in sheet_data
+                )
+                pending_files.append((file, len(extracted_data['trades'])))
+                
+            except Exception as e:
+                print(f"❌ Erro crítico ao processar {file['name']}: {str(e)}")
+                pending_marks.append((file['id'], file['name'], "ERRO"))
                 continue
-            
-            # 4. Preparação dos dados para a planilha
-            sheet_data = prepare_sheet_data(extracted_data)
-            print(sheet_data)
-            # 5. Envio para o Google Sheets
-            update_sheet(
-                sheets_service,
-                sheet_data,
-                file_name=file['name']
-            )
-            
-            # 6. Marca como processado
-            mark_as_processed(
-                drive_service,
-                file['id'],
-                file['name'],
-                "SUCESSO"
-            )
-            
-            print(f"✅ Processado com sucesso: {len(extracted_data['trades'])} negociações")
-            
-        except Exception as e:
-            print(f"❌ Erro crítico ao processar {file['name']}: {str(e)}")
-            mark_as_processed(
-                drive_service,
-                file['id'],
-                file['name'],
-                "ERRO"
-            )
-            continue
+    
+    # 5. Envio para o Google Sheets: uma única chamada para todos os arquivos
+    status = "SUCESSO"
+    if pending_rows:
+        try:
+            append_rows(sheets_service, pending_rows)
+        except Exception:
+            status = "ERRO"
+    
+    # 6. Marca como processado (só depois de a planilha confirmar a gravação)
+    pending_marks.extend((file['id'], file['name'], status) for file, _ in pending_files)
+    mark_files_as_processed(drive_service, pending_marks)
+    
+    if status == "SUCESSO":
+        for file, total_trades in pending_files:
+            print(f"✅ Processado com sucesso: {file['name']} ({total_trades} negociações)")
 
+def _download_and_extract(drive_service, file):
+    """Baixa o PDF do Drive e extrai o texto (roda nas threads do pool)"""
+    # 1. Download do arquivo em trechos, direto para o buffer lido pelo pdfplumber
+    request = drive_service.files().get_media(fileId=file['id'])
+    buffer = io.BytesIO()
+    downloader = MediaIoBaseDownload(buffer, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk()
+    
+    # 2. Extração de texto com tratamento de erro
+    return extract_text_from_pdf(
+        buffer,
+        password=os.getenv("PDF_PASSWORD"),
+        max_pages=MAX_PAGES
+    )
 
 
 def prepare_sheet_data(extracted_data):
-    """Prepara os dados no formato para a planilha"""
+    """Prepara os dados no formato para a planilha (uma linha por negociação)"""
     sheet_data = []
     
     # Dados das negociações
@@ -343,7 +442,7 @@ def prepare_sheet_data(extracted_data):
             trade['natureza']
         ])
     
-    return sheet_data[0]
+    return sheet_data
 
 def main():
     drive, sheets = get_services()
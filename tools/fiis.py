@@ -1,8 +1,34 @@
 """
 Tools para análise de Fundos de Investimento Imobiliário (FIIs)
 """
+import threading
+import time
 import yfinance as yf
 from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Cache com expiração das consultas ao Yahoo: (ticker, dado) -> (instante, valor)
+_CACHE = {}
+_CACHE_TTL = 300  # segundos; cotação e proventos não mudam na escala de segundos
+_CACHE_MAX = 512
+_CACHE_LOCK = threading.Lock()
+
+
+def _consultar(ticker: str, dado: str):
+    """Atributo `dado` (info, dividends) do yf.Ticker, reaproveitado por _CACHE_TTL segundos."""
+    chave = (ticker, dado)
+    item = _CACHE.get(chave)
+    if item is not None and time.monotonic() - item[0] < _CACHE_TTL:
+        return item[1]
+
+    valor = getattr(yf.Ticker(ticker), dado)
+    with _CACHE_LOCK:
+        _CACHE.pop(chave, None)
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[chave] = (time.monotonic(), valor)
+    return valor
 
 
 class FIIsTools:
@@ -24,8 +50,7 @@ class FIIsTools:
             ticker = f"{ticker}.SA"
 
         try:
-            fii = yf.Ticker(ticker)
-            info = fii.info
+            info = _consultar(ticker, "info")
 
             return {
                 "ticker": ticker.replace('.SA', ''),
@@ -53,9 +78,8 @@ class FIIsTools:
             ticker = f"{ticker}.SA"
 
         try:
-            fii = yf.Ticker(ticker)
-            dividends = fii.dividends
-            info = fii.info
+            dividends = _consultar(ticker, "dividends")
+            info = _consultar(ticker, "info")
 
             if dividends.empty:
                 return {"ticker": ticker.replace('.SA', ''), "mensagem": "Sem histórico de dividendos"}
@@ -124,11 +148,12 @@ class FIIsTools:
         Returns:
             Lista com comparativo dos FIIs ordenado por DY
         """
-        results = []
-        for ticker in tickers:
-            div_info = self.get_fii_dividends(ticker)
-            if "erro" not in div_info:
-                results.append(div_info)
+        # As consultas ao Yahoo são de rede: em paralelo, mantendo a ordem dos tickers
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(tickers)))) as executor:
+            results = [
+                div_info for div_info in executor.map(self.get_fii_dividends, tickers)
+                if "erro" not in div_info
+            ]
 
         # Ordena por dividend yield
         results.sort(key=lambda x: x.get("dividend_yield_anual", 0), reverse=True)
@@ -2,7 +2,9 @@
 Tools para controle de gastos pessoais e orçamento
 """
 from typing import Optional, List, Dict
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
+import heapq
 import json
 import os
 
@@ -12,7 +14,25 @@ class GastosTools:
 
     def __init__(self, arquivo_dados: str = "dados_financeiros.json"):
         self.arquivo_dados = arquivo_dados
-        self.dados = self._carregar_dados()
+        # Arquivo lido e indexado só no primeiro uso, não ao montar o agente
+        self._dados = None
+        self._indice = None
+        # Data "YYYY-MM-DD" -> dia ordinal, convertida uma única vez por instância
+        self._dia_ordinal = {}
+
+    @property
+    def dados(self) -> dict:
+        """Dados financeiros, carregados do arquivo no primeiro acesso"""
+        if self._dados is None:
+            self._dados = self._carregar_dados()
+        return self._dados
+
+    @property
+    def _indice_mes(self) -> dict:
+        """Índice por mês, montado no primeiro acesso"""
+        if self._indice is None:
+            self._indice = self._indexar_por_mes()
+        return self._indice
 
     def _carregar_dados(self) -> dict:
         """Carrega dados do arquivo JSON"""
@@ -35,10 +55,27 @@ class GastosTools:
             ]
         }
 
+    def _indexar_por_mes(self) -> dict:
+        """Agrupa gastos e receitas por (tipo, "YYYY-MM") para o resumo não varrer todo o histórico"""
+        indice = defaultdict(list)
+        for tipo in ("gastos", "receitas"):
+            for registro in self.dados.get(tipo, []):
+                indice[(tipo, registro["data"][:7])].append(registro)
+        return indice
+
+    def _ordinal(self, data: str) -> int:
+        """Dia ordinal de uma data do histórico (strptime só na primeira vez)"""
+        dia = self._dia_ordinal.get(data)
+        if dia is None:
+            dia = self._dia_ordinal[data] = datetime.strptime(data, "%Y-%m-%d").toordinal()
+        return dia
+
     def _salvar_dados(self):
         """Salva dados no arquivo JSON"""
+        # Serializa tudo antes e grava de uma vez (json.dump faria uma escrita por trecho)
+        conteudo = json.dumps(self.dados, ensure_ascii=False, indent=2)
         with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-            json.dump(self.dados, f, ensure_ascii=False, indent=2)
+            f.write(conteudo)
 
     def registrar_gasto(self, valor: float, categoria: str, descricao: str,
                         data: Optional[str] = None) -> dict:
@@ -67,6 +104,9 @@ class GastosTools:
         }
 
         self.dados["gastos"].append(gasto)
+        # Se o índice ainda não foi montado, ele já nascerá com o novo registro
+        if self._indice is not None:
+            self._indice[("gastos", data[:7])].append(gasto)
         self._salvar_dados()
 
         return {
@@ -102,6 +142,9 @@ class GastosTools:
         }
 
         self.dados["receitas"].append(receita)
+        # Se o índice ainda não foi montado, ele já nascerá com o novo registro
+        if self._indice is not None:
+            self._indice[("receitas", data[:7])].append(receita)
         self._salvar_dados()
 
         return {
@@ -146,17 +189,10 @@ class GastosTools:
         if ano is None:
             ano = datetime.now().year
 
-        # Filtrar gastos do mês
-        gastos_mes = [
-            g for g in self.dados["gastos"]
-            if g["data"].startswith(f"{ano}-{mes:02d}")
-        ]
-
-        # Filtrar receitas do mês
-        receitas_mes = [
-            r for r in self.dados["receitas"]
-            if r["data"].startswith(f"{ano}-{mes:02d}")
-        ]
+        # Gastos e receitas do mês, direto do índice por mês
+        periodo = f"{ano}-{mes:02d}"
+        gastos_mes = self._indice_mes.get(("gastos", periodo), [])
+        receitas_mes = self._indice_mes.get(("receitas", periodo), [])
 
         # Calcular totais por categoria
         gastos_por_categoria = {}
@@ -220,8 +256,12 @@ class GastosTools:
         if categoria:
             gastos = [g for g in gastos if g["categoria"] == categoria]
 
-        # Ordenar por data (mais recente primeiro)
-        gastos = sorted(gastos, key=lambda x: x["data"], reverse=True)[:limite]
+        # Ordenar por data (mais recente primeiro); com limite positivo basta
+        # selecionar os maiores, sem ordenar o histórico inteiro
+        if limite > 0:
+            gastos = heapq.nlargest(limite, gastos, key=lambda x: x["data"])
+        else:
+            gastos = sorted(gastos, key=lambda x: x["data"], reverse=True)[:limite]
 
         return {
             "total_registros": len(gastos),
@@ -238,31 +278,28 @@ class GastosTools:
         if not self.dados["gastos"]:
             return {"mensagem": "Nenhum gasto registrado ainda"}
 
-        # Gastos dos últimos 3 meses
-        hoje = datetime.now()
-        gastos_recentes = []
+        # Gastos dos últimos 3 meses, já agrupados por categoria numa única passada.
+        # (hoje - data).days <= 90 equivale a data > (hoje - 91 dias) no calendário,
+        # então basta comparar dias ordinais, convertidos uma vez por data distinta
+        limite = (datetime.now() - timedelta(days=91)).toordinal()
+        ordinal = self._ordinal
+        por_categoria = {}
         for g in self.dados["gastos"]:
-            data_gasto = datetime.strptime(g["data"], "%Y-%m-%d")
-            diff = (hoje - data_gasto).days
-            if diff <= 90:
-                gastos_recentes.append(g)
+            if ordinal(g["data"]) > limite:
+                valores = por_categoria.get(g["categoria"])
+                if valores is None:
+                    valores = por_categoria[g["categoria"]] = []
+                valores.append(g["valor"])
 
-        if not gastos_recentes:
+        if not por_categoria:
             return {"mensagem": "Nenhum gasto nos últimos 3 meses"}
 
-        # Análise por categoria
-        por_categoria = {}
-        for g in gastos_recentes:
-            cat = g["categoria"]
-            if cat not in por_categoria:
-                por_categoria[cat] = []
-            por_categoria[cat].append(g["valor"])
-
         analise = {}
         for cat, valores in por_categoria.items():
+            total = sum(valores)
             analise[cat] = {
-                "total": round(sum(valores), 2),
-                "media": round(sum(valores) / len(valores), 2),
+                "total": round(total, 2),
+                "media": round(total / len(valores), 2),
                 "quantidade": len(valores),
                 "maior_gasto": round(max(valores), 2),
                 "menor_gasto": round(min(valores), 2)
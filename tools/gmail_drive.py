@@ -3,11 +3,14 @@ import os
 import io
 import base64
 import os.path
+import threading
+import google_auth_httplib2
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.discovery import build
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import HttpRequest, MediaIoBaseUpload, build_http
 from dotenv import load_dotenv
 
 # Esse Script monitora o email do cliente e verifica se existe emails recebidos
@@ -21,8 +24,24 @@ SCOPES = [
     'https://www.googleapis.com/auth/gmail.modify'
 ]
 
-def get_gmail_service():
-    """Autentica e retorna o serviço Gmail"""
+# Chamadas do Gmail por requisição HTTP em lote (o limite recomendado é 50)
+GMAIL_BATCH_SIZE = 50
+# Ids por chamada users.messages.batchModify (limite da API)
+GMAIL_MODIFY_BATCH_SIZE = 1000
+# Uploads simultâneos para o Drive (não há upload de mídia em lote)
+DRIVE_UPLOAD_WORKERS = int(os.getenv("DRIVE_UPLOAD_WORKERS") or 4)
+# Acima deste tamanho o upload é resumable; abaixo, um único POST multipart
+DRIVE_SIMPLE_UPLOAD_MAX = 5 * 1024 * 1024
+
+# Credenciais lidas do token.json uma vez e compartilhadas pelos serviços
+_creds = None
+
+def get_credentials():
+    """Autentica e retorna as credenciais do Google"""
+    global _creds
+    if _creds is not None:
+        return _creds
+
     creds = None
     if os.path.exists('token.json'):
         creds = Credentials.from_authorized_user_file('token.json', SCOPES)
@@ -40,28 +59,47 @@ def get_gmail_service():
         with open('token.json', 'w') as token:
             token.write(creds.to_json())
     
-    return build('gmail', 'v1', credentials=creds)
+    _creds = creds
+    return creds
+
+# Serviços já construídos: (api, versão) -> serviço
+_services = {}
+
+def _build_service(name, version):
+    """Cria o serviço usando a conexão autenticada da thread que faz a requisição"""
+    service = _services.get((name, version))
+    if service is not None:
+        return service
+
+    creds = get_credentials()
+
+    # O httplib2 não é thread-safe: cada thread de upload faz suas requisições
+    # numa conexão autenticada própria (padrão documentado do googleapiclient).
+    # Na thread principal, Gmail e Drive reaproveitam a mesma conexão (keep-alive)
+    def request_builder(http, *args, **kwargs):
+        return HttpRequest(_thread_http(creds), *args, **kwargs)
+
+    service = _services[(name, version)] = build(
+        name, version, credentials=creds, requestBuilder=request_builder
+    )
+    return service
+
+def get_gmail_service():
+    """Autentica e retorna o serviço Gmail"""
+    return _build_service('gmail', 'v1')
 
 def get_drive_service():
     """Autentica e retorna o serviço Drive"""
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'credentials.json',
-                SCOPES,
-                redirect_uri='urn:ietf:wg:oauth:2.0:oob')
-            creds = flow.run_local_server(port=0)
-        
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
-    
-    return build('drive', 'v3', credentials=creds)
+    return _build_service('drive', 'v3')
+
+_thread_local = threading.local()
+
+def _thread_http(creds):
+    """Conexão autenticada da thread atual, criada na primeira requisição dela"""
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = _thread_local.http = google_auth_httplib2.AuthorizedHttp(creds, http=build_http())
+    return http
 
 ##################################################################################
 
@@ -76,7 +114,7 @@ def upload_to_drive(drive_service, file_data, filename, folder_id=None):
     
     media = MediaIoBaseUpload(io.BytesIO(file_data),
                             mimetype='application/pdf',
-                            resumable=True)
+                            resumable=len(file_data) > DRIVE_SIMPLE_UPLOAD_MAX)
     
     file = drive_service.files().create(
         body=file_metadata,
@@ -90,6 +128,48 @@ def upload_to_drive(drive_service, file_data, filename, folder_id=None):
 
 ##################################################################################
 
+def execute_batch(service, requests):
+    """Executa chamadas do Gmail em requisições HTTP em lote, na ordem recebida"""
+    responses = {}
+    errors = []
+
+    def collect(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            responses[request_id] = response
+
+    # Cada lote leva até GMAIL_BATCH_SIZE chamadas numa única ida ao servidor
+    for start in range(0, len(requests), GMAIL_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=collect)
+        for i, request in enumerate(requests[start:start + GMAIL_BATCH_SIZE], start=start):
+            batch.add(request, request_id=str(i))
+        batch.execute()
+        if errors:
+            raise errors[0]
+
+    return [responses[str(i)] for i in range(len(requests))]
+
+def get_messages_batch(service, message_ids):
+    """Busca as mensagens em requisições HTTP em lote, na ordem dos ids"""
+    return execute_batch(service, [
+        service.users().messages().get(userId='me', id=message_id, format='full')
+        for message_id in message_ids
+    ])
+
+def mark_as_read(service, message_ids):
+    """Remove o marcador UNREAD dos e-mails em chamadas batchModify"""
+    for start in range(0, len(message_ids), GMAIL_MODIFY_BATCH_SIZE):
+        service.users().messages().batchModify(
+            userId='me',
+            body={
+                'ids': message_ids[start:start + GMAIL_MODIFY_BATCH_SIZE],
+                'removeLabelIds': ['UNREAD']
+            }
+        ).execute()
+
+##################################################################################
+
 def process_pdf_attachments(service, drive_service, folder_id=None):
     """Processa anexos PDF dos e-mails"""
     # Busca de ambos os remetentes possíveis da Rico (no-reply e noreply)
@@ -108,13 +188,12 @@ def process_pdf_attachments(service, drive_service, folder_id=None):
     
     print(f"📨 Processando {len(messages)} e-mails com anexos PDF...")
     
-    for message in messages:
-        msg = service.users().messages().get(
-            userId='me',
-            id=message['id'],
-            format='full'
-        ).execute()
-        
+    # Todas as mensagens buscadas em lote, em vez de um get por e-mail
+    full_messages = get_messages_batch(service, [message['id'] for message in messages])
+    
+    # Anexos PDF de todos os e-mails: (id do e-mail, id do anexo, nome do arquivo)
+    pending = []
+    for message, msg in zip(messages, full_messages):
         headers = {h['name']: h['value'] for h in msg['payload']['headers']}
         print(f"\n📧 Assunto: {headers.get('Subject', '')}")
         
@@ -125,22 +204,40 @@ def process_pdf_attachments(service, drive_service, folder_id=None):
                 print(f"📄 Anexo encontrado: {filename}")
                 
                 if 'body' in part and 'attachmentId' in part['body']:
-                    attachment_id = part['body']['attachmentId']
-                    attachment = service.users().messages().attachments().get(
-                        userId='me',
-                        messageId=message['id'],
-                        id=attachment_id
-                    ).execute()
-                    
-                    file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
-                    upload_to_drive(drive_service, file_data, filename, folder_id)
-                    
-                    # Marcar como lido (opcional)
-                    service.users().messages().modify(
-                        userId='me',
-                        id=message['id'],
-                        body={'removeLabelIds': ['UNREAD']}
-                    ).execute()
+                    pending.append((message['id'], part['body']['attachmentId'], filename))
+    
+    # Todos os anexos baixados em lote, em vez de um attachments.get por arquivo
+    attachments = execute_batch(service, [
+        service.users().messages().attachments().get(
+            userId='me',
+            messageId=message_id,
+            id=attachment_id
+        )
+        for message_id, attachment_id, _ in pending
+    ])
+    
+    # Uploads enviados ao pool: (id do e-mail, future do upload)
+    uploads = []
+    try:
+        with ThreadPoolExecutor(max_workers=DRIVE_UPLOAD_WORKERS) as pool:
+            for (message_id, _, filename), attachment in zip(pending, attachments):
+                file_data = base64.urlsafe_b64decode(attachment['data'].encode('UTF-8'))
+                uploads.append((message_id, pool.submit(
+                    upload_to_drive, drive_service, file_data, filename, folder_id
+                )))
+    finally:
+        # O with só termina depois de todos os uploads; e-mails com algum
+        # anexo que falhou continuam não lidos
+        failed = {message_id for message_id, future in uploads if future.exception() is not None}
+        # Ids na ordem em que foram processados (dict evita repetir o mesmo e-mail)
+        processed_ids = {message_id: None for message_id, _ in uploads if message_id not in failed}
+        # Marcar como lido (opcional): uma chamada batchModify por até
+        # GMAIL_MODIFY_BATCH_SIZE e-mails, só para os anexos já enviados ao Drive
+        mark_as_read(service, list(processed_ids))
+    
+    # Repassa o primeiro erro de upload, como acontecia no envio sequencial
+    for _, future in uploads:
+        future.result()
 
 ##################################################################################
 
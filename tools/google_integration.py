@@ -33,6 +33,22 @@ SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
 ]
 
+# Regexes da nota da Rico, compiladas uma vez por processo e não a cada PDF
+_TRADE_RE = re.compile(
+    r'(?P<num_neg>\d+-[A-Z]+)\s+'
+    r'(?P<cv>[CV])\s+'
+    r'(?P<mercado>[A-ZÇÃÉÓÚÍ]+)\s+'
+    r'(?P<ativo>[A-Z0-9\s]+?)\s+'
+    r'(?P<qtd>\d+)\s+'
+    r'(?P<preco>[\d\.,]+)\s+'
+    r'(?P<valor>[\d\.,]+)\s+'
+    r'(?P<dc>[CD])'
+)
+_DATE_RE = re.compile(r'\d{2}/\d{2}/\d{4}')
+_CLEAN_ASSET_RE = re.compile(r'[@#*]\s*$')
+# Número no formato brasileiro (1.234,56) para float, numa única passada
+_NUM_TABLE = str.maketrans({'.': None, ',': '.'})
+
 
 class GoogleIntegrationTools:
     """Ferramentas para integração com Gmail, Drive e Sheets"""
@@ -657,18 +673,7 @@ class GoogleIntegrationTools:
         """Extrai dados de negociação do texto"""
         trades = []
 
-        trade_pattern = re.compile(
-            r'^(?P<num_neg>\d+-[A-Z]+)\s+'
-            r'(?P<cv>[CV])\s+'
-            r'(?P<mercado>[A-ZÇÃÉÓÚÍ]+)\s+'
-            r'(?P<ativo>[A-Z0-9\s]+?)\s+'
-            r'(?P<qtd>\d+)\s+'
-            r'(?P<preco>[\d\.,]+)\s+'
-            r'(?P<valor>[\d\.,]+)\s+'
-            r'(?P<dc>[CD])'
-        )
-
-        date_match = re.search(r'\d{2}/\d{2}/\d{4}', text)
+        date_match = _DATE_RE.search(text)
         trade_date = date_match.group() if date_match else None
 
         for line in text.split('\n'):
@@ -676,20 +681,21 @@ class GoogleIntegrationTools:
             if not line or 'Q Negociação' in line:
                 continue
 
-            match = trade_pattern.search(line)
+            match = _TRADE_RE.match(line)
             if match:
+                # Grupos desempacotados por posição, sem busca por nome a cada campo
+                num_neg, cv, mercado, ativo, qtd, preco, valor, dc = match.groups()
                 try:
-                    asset = re.sub(r'[@#*]\s*$', '', match.group('ativo')).strip()
                     trades.append({
                         'data': trade_date,
-                        'num_negociacao': match.group('num_neg'),
-                        'operacao': 'Compra' if match.group('cv') == 'C' else 'Venda',
-                        'mercado': match.group('mercado'),
-                        'ativo': asset,
-                        'quantidade': int(match.group('qtd')),
-                        'preco': float(match.group('preco').replace('.', '').replace(',', '.')),
-                        'valor': float(match.group('valor').replace('.', '').replace(',', '.')),
-                        'natureza': match.group('dc')
+                        'num_negociacao': num_neg,
+                        'operacao': 'Compra' if cv == 'C' else 'Venda',
+                        'mercado': mercado,
+                        'ativo': _CLEAN_ASSET_RE.sub('', ativo).strip(),
+                        'quantidade': int(qtd),
+                        'preco': float(preco.translate(_NUM_TABLE)),
+                        'valor': float(valor.translate(_NUM_TABLE)),
+                        'natureza': dc
                     })
                 except:
                     continue
@@ -709,15 +715,10 @@ class GoogleIntegrationTools:
 
         sheet_name = "Negociações"
 
-        result = sheets_service.spreadsheets().values().get(
-            spreadsheetId=sheets_id,
-            range=f"{sheet_name}!A:A"
-        ).execute()
-        next_row = len(result.get('values', [])) + 1
-
+        # O append encontra a próxima linha vazia no servidor (sem baixar a coluna A antes)
         sheets_service.spreadsheets().values().append(
             spreadsheetId=sheets_id,
-            range=f"{sheet_name}!A{next_row}",
+            range=f"{sheet_name}!A:A",
             valueInputOption="USER_ENTERED",
             insertDataOption="INSERT_ROWS",
             body={"values": [row_data], "majorDimension": "ROWS"}